@@ -0,0 +1,298 @@
+import sys
+import math
+import time
+import tracemalloc
+import argparse
+from converter import *
+from synthetic_treebank import *
+
+# benchmarks for the converter. every stage of the conversion is timed on its own, on synthetic sentences (see. synthetic_treebank.py)
+# or on a sample of a real treebank, and the growth of the cost of the hot stages with the length of a sentence is measured for every shape of tree.
+# nest_order_quadratic() is the original nest_order(), kept here as the reference the current one is measured against.
+
+def nest_order_quadratic(tokens):
+    ordered_tokens = []
+    ordered_tokens_waiting_room = []
+    ordered_tokens_reception = []
+    terminal_dependants = []
+
+    for token in tokens:
+        for other_token in tokens:
+            if token.id == other_token.head:
+                token.dependants.append(other_token)
+
+        token.dependants.sort(key=f_hierarchy)
+
+    for token in tokens:
+        if len(token.dependants) == 0:
+            terminal_dependants.append(token)
+
+    for token in terminal_dependants:
+        pred_format(token)
+
+    for token in tokens:
+        if token.head == 0:
+            matrix_pred = token
+
+    ordered_tokens.append(matrix_pred)
+
+    for dependant in matrix_pred.dependants:
+        ordered_tokens_waiting_room.append(dependant)
+
+    while len(ordered_tokens_waiting_room) > 0:
+        for token in ordered_tokens_waiting_room:
+            for dependant in token.dependants:
+                ordered_tokens_reception.append(dependant)
+
+        ordered_tokens = ordered_tokens + ordered_tokens_waiting_room
+        ordered_tokens_waiting_room = ordered_tokens_reception
+        ordered_tokens_reception = []
+
+    ordered_heads = []
+
+    for token in ordered_tokens:
+        if token not in terminal_dependants:
+            ordered_heads.append(token)
+
+    ordered_heads.reverse()
+
+    return ordered_heads
+
+def converted_tokens(sentence, feature_projection=()):
+    tokens = []
+
+    for token in sentence:
+        token_object = Token(token)
+        token_object.convert(feature_projection)
+        tokens.append(token_object)
+
+    return tokens
+
+def best_time(function, repeats, prepare=None):
+    best = None
+
+    for repeat in range(repeats):
+        prepared = None
+
+        if prepare != None:
+            prepared = prepare()
+
+        start = time.perf_counter()
+        function(prepared)
+        elapsed = time.perf_counter() - start
+
+        if best == None or elapsed < best:
+            best = elapsed
+
+    return best
+
+    # every stage is run repeats times and its fastest run is kept, which is the least disturbed by everything else on the machine.
+    # anything a stage needs which another stage makes (like converted tokens for nest_order()) is prepared outside the timer.
+
+def converted_sentences(sentences, options):
+    filtered_sentences = []
+
+    for sentence in sentences:
+        filtered_sentence = parse_filter(sentence)
+
+        if type(filtered_sentence) == list:
+            try:
+                f_compose(filtered_sentence, options)
+                filtered_sentences.append(filtered_sentence)
+
+            except Exception:
+                pass
+
+    return filtered_sentences
+
+    # only sentences which can be converted are benchmarked, so that no stage is timed on the path of an exception.
+
+def stage_timings(conllu_text, options, repeats):
+    sentences = parse(conllu_text)
+    filtered_sentences = converted_sentences(sentences, options)
+    feature_projection = options['compiled_feature_projection']
+
+    all_tokens = sum([len(sentence) for sentence in sentences])
+    filtered_tokens = sum([len(sentence) for sentence in filtered_sentences])
+
+    def prepare_tokens():
+        return [converted_tokens(sentence, feature_projection) for sentence in filtered_sentences]
+
+    f_structures = [(str(ordinal + 1), f_compose(sentence, options)) for ordinal, sentence in enumerate(filtered_sentences)]
+
+    timings = [
+        ('parse', best_time(lambda prepared: parse(conllu_text), repeats), len(sentences), all_tokens),
+        ('read_conllu', best_time(lambda prepared: read_conllu(conllu_text), repeats), len(sentences), all_tokens),
+        ('parse_filter', best_time(lambda prepared: [parse_filter(sentence) for sentence in sentences], repeats), len(sentences), all_tokens),
+        ('Token + convert', best_time(lambda prepared: prepare_tokens(), repeats), len(filtered_sentences), filtered_tokens),
+        ('nest_order', best_time(lambda prepared: [nest_order(tokens) for tokens in prepared], repeats, prepare_tokens), len(filtered_sentences), filtered_tokens),
+        ('f_compose', best_time(lambda prepared: [f_compose(sentence, options) for sentence in filtered_sentences], repeats), len(filtered_sentences), filtered_tokens)
+    ]
+
+    for output_format in output_formats:
+        timings.append(('serialize ' + output_format, best_time(lambda prepared: [encode_record(output_format, sent_id, f_structure) for sent_id, f_structure in f_structures], repeats), len(filtered_sentences), filtered_tokens))
+
+    return timings
+
+    # f_compose() includes the creation and conversion of the tokens and nest_order(), which are also timed on their own.
+    # filtered sentences are lists without metadata, so they are serialized with their position as their sent_id.
+
+def print_stage_timings(title, timings):
+    print(title)
+    print('{:<18} {:>12} {:>14} {:>14}'.format('stage', 'time (ms)', 'sentences/s', 'tokens/s'))
+
+    for stage, seconds, sentence_count, token_count in timings:
+        seconds = max(seconds, 1e-9)
+        print('{:<18} {:>12.2f} {:>14.0f} {:>14.0f}'.format(stage, seconds * 1000, sentence_count / seconds, token_count / seconds))
+
+    print()
+
+def growth_exponent(lengths, seconds):
+    log_lengths = [math.log(length) for length in lengths]
+    log_seconds = [math.log(max(time_taken, 1e-9)) for time_taken in seconds]
+    mean_length = sum(log_lengths) / len(log_lengths)
+    mean_seconds = sum(log_seconds) / len(log_seconds)
+    covariance = sum([(x - mean_length) * (y - mean_seconds) for x, y in zip(log_lengths, log_seconds)])
+    variance = sum([(x - mean_length) ** 2 for x in log_lengths])
+
+    return covariance / variance
+
+    # the time per sentence is assumed to grow as length ** exponent, so the exponent is the slope of a least-squares line through the log-log points.
+    # an exponent near 1 is linear growth; anything well above 1 means that a stage does more work per token the longer the sentence is.
+
+def scaling_test(shape, lengths, options, repeats, tokens_per_length, max_exponent):
+    stage_seconds = {'nest_order': [], 'f_compose': []}
+    feature_projection = options['compiled_feature_projection']
+
+    for length in lengths:
+        count = max(1, tokens_per_length // length)
+        filtered_sentences = converted_sentences(parse(synthetic_treebank(shape, length, count)), options)
+
+        def prepare_tokens():
+            return [converted_tokens(sentence, feature_projection) for sentence in filtered_sentences]
+
+        nest_order_time = best_time(lambda prepared: [nest_order(tokens) for tokens in prepared], repeats, prepare_tokens)
+        f_compose_time = best_time(lambda prepared: [f_compose(sentence, options) for sentence in filtered_sentences], repeats)
+
+        stage_seconds['nest_order'].append(nest_order_time / max(1, len(filtered_sentences)))
+        stage_seconds['f_compose'].append(f_compose_time / max(1, len(filtered_sentences)))
+
+    super_linear = []
+
+    print('scaling of {} trees (ms per sentence)'.format(shape))
+    print('{:<12}'.format('stage') + ''.join(['{:>10}'.format(length) for length in lengths]) + '{:>10}'.format('exponent'))
+
+    for stage in stage_seconds:
+        exponent = growth_exponent(lengths, stage_seconds[stage])
+        flag = ''
+
+        if exponent > max_exponent:
+            flag = '  SUPER-LINEAR'
+            super_linear.append((shape, stage, exponent))
+
+        print('{:<12}'.format(stage) + ''.join(['{:>10.3f}'.format(seconds * 1000) for seconds in stage_seconds[stage]]) + '{:>10.2f}'.format(exponent) + flag)
+
+    print()
+
+    return super_linear
+
+    # the same number of tokens is converted at every length, so that every length is timed with a similar amount of work.
+
+def time_nest_order(nest_order_function, sentence, repeats):
+    total = 0.0
+
+    for repeat in range(repeats):
+        tokens = converted_tokens(sentence)
+        start = time.perf_counter()
+        nest_order_function(tokens)
+        total += time.perf_counter() - start
+
+    return total / repeats
+
+    # the tokens are rebuilt for every repeat, because nest_order() fills in their dependants, and only nest_order() itself is timed.
+
+def benchmark_nest_order(lengths, repeats, seed):
+    print('{:>8} {:>14} {:>14} {:>9}'.format('tokens', 'quadratic (ms)', 'linear (ms)', 'speedup'))
+
+    for length in lengths:
+        sentence = parse_filter(parse(synthetic_treebank('random', length, 1, seed))[0])
+        quadratic_time = time_nest_order(nest_order_quadratic, sentence, repeats)
+        linear_time = time_nest_order(nest_order, sentence, repeats)
+
+        print('{:>8} {:>14.3f} {:>14.3f} {:>8.1f}x'.format(length, quadratic_time * 1000, linear_time * 1000, quadratic_time / linear_time))
+
+    print()
+
+def benchmark_token_memory(token_count, seed):
+    sentences = [parse_filter(sentence) for sentence in parse(synthetic_treebank('random', 20, max(1, token_count // 20), seed))]
+    sentences = [sentence for sentence in sentences if type(sentence) == list]
+    converted_token_count = sum([len(sentence) for sentence in sentences])
+
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    tokens = []
+
+    for sentence in sentences:
+        tokens.append(converted_tokens(sentence))
+
+    token_memory = tracemalloc.get_traced_memory()[0] - start_memory
+    tracemalloc.stop()
+
+    print('{} converted tokens: {:.1f} MB per 1M tokens'.format(converted_token_count, token_memory / converted_token_count * 1000000 / 2 ** 20))
+    print()
+
+    # the memory counted is everything allocated while the tokens are created and converted, including their values and the lists which hold them.
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='benchmark the stages of the converter on synthetic sentences and on samples of real treebanks.')
+    argument_parser.add_argument('--conllu', nargs='*', default=[], metavar='FILE', help='also time the stages on the first --sample-size sentences of these CoNLL-U files.')
+    argument_parser.add_argument('--sample-size', type=int, default=2000)
+    argument_parser.add_argument('--synthetic-count', type=int, default=2000, help='synthetic sentences of 20 tokens timed stage by stage.')
+    argument_parser.add_argument('--shapes', nargs='*', choices=shapes, default=shapes, help='shapes of tree for the scaling tests.')
+    argument_parser.add_argument('--lengths', type=int, nargs='+', default=[10, 20, 40, 80, 160, 320])
+    argument_parser.add_argument('--tokens-per-length', type=int, default=20000)
+    argument_parser.add_argument('--max-exponent', type=float, default=1.3, help='growth exponent above which a stage is flagged as super-linear (default: 1.3).')
+    argument_parser.add_argument('--repeats', type=int, default=5)
+    argument_parser.add_argument('--seed', type=int, default=0)
+    argument_parser.add_argument('--feat-gfs', choices=['y', 'n'], default='y')
+    argument_parser.add_argument('--nest-order', action='store_true', help='also compare nest_order() with the original quadratic implementation.')
+    argument_parser.add_argument('--memory', type=int, default=0, metavar='TOKENS', help='also measure the memory of this many converted tokens.')
+    arguments = argument_parser.parse_args()
+
+    options = compile_options({'generate_feat_gfs': arguments.feat_gfs == 'y'})
+
+    print_stage_timings('synthetic random trees, {} sentences of 20 tokens'.format(arguments.synthetic_count),
+                        stage_timings(synthetic_treebank('random', 20, arguments.synthetic_count, arguments.seed), options, arguments.repeats))
+
+    for conllu_path in arguments.conllu:
+        sample_lines = []
+        sample_sentences = 0
+
+        with open(conllu_path, 'r') as conllu_file:
+            for block in read_sentence_blocks(conllu_file, 1):
+                sample_lines.append(block)
+                sample_sentences += 1
+
+                if sample_sentences == arguments.sample_size:
+                    break
+
+        print_stage_timings('{}, first {} sentences'.format(conllu_path, sample_sentences), stage_timings(''.join(sample_lines), options, arguments.repeats))
+
+    super_linear = []
+
+    for shape in arguments.shapes:
+        super_linear.extend(scaling_test(shape, arguments.lengths, options, arguments.repeats, arguments.tokens_per_length, arguments.max_exponent))
+
+    if arguments.nest_order == True:
+        benchmark_nest_order(arguments.lengths, arguments.repeats, arguments.seed)
+
+    if arguments.memory > 0:
+        benchmark_token_memory(arguments.memory, arguments.seed)
+
+    if len(super_linear) != 0:
+        for shape, stage, exponent in super_linear:
+            print('{} grows as length ** {:.2f} on {} trees'.format(stage, exponent, shape))
+
+        sys.exit(1)
+
+    # the benchmark exits with status 1 if any stage grows super-linearly, so that it can be run as a check before a change is merged.
@@ -0,0 +1,159 @@
+import os
+import random
+from converter import *
+
+# a CoNLL-U index lists every sentence of a CoNLL-U file with its sent_id, the byte offset and length of its block of text and its number of tokens.
+# it is kept next to the file, the file's path with '.offsets' appended, and built again whenever the file's size or modification time changes.
+# with the index, a subset of the sentences can be converted by seeking straight to their blocks, without reading or parsing the rest of the file.
+
+def conllu_index_path(path):
+    return path + '.offsets'
+
+def file_signature(path):
+    file_stat = os.stat(path)
+
+    return '# size = {} mtime = {}'.format(file_stat.st_size, file_stat.st_mtime_ns)
+
+def build_conllu_index(path):
+    entries = []
+    block_offset = None
+    block_length = 0
+    block_lines = []
+    offset = 0
+
+    with open(path, 'rb') as conllu_file:
+        for line in conllu_file:
+            if line.strip() == b'':
+                if block_offset != None:
+                    block = b''.join(block_lines).decode('utf-8')
+                    entries.append((block_sent_id(block, len(entries) + 1), block_offset, block_length, block_token_count(block)))
+                    block_offset = None
+                    block_length = 0
+                    block_lines = []
+
+            else:
+                if block_offset == None:
+                    block_offset = offset
+
+                block_length += len(line)
+
+                if line[0] == 35:
+                    block_lines.append(line)
+
+                else:
+                    block_lines.append(b'.\n')
+
+            offset += len(line)
+
+    if block_offset != None:
+        block = b''.join(block_lines).decode('utf-8')
+        entries.append((block_sent_id(block, len(entries) + 1), block_offset, block_length, block_token_count(block)))
+
+    return entries
+
+    # the file is cut into blocks at the empty lines exactly as read_sentence_blocks() in converter.py cuts it, so the sentences are numbered in the same way.
+    # only the comments of a block are kept to read its sent_id from (35 is '#'); every token line is replaced by a placeholder which is only counted.
+
+def read_conllu_index(path):
+    signature = file_signature(path)
+
+    if os.path.exists(conllu_index_path(path)) == True:
+        with open(conllu_index_path(path), 'r', encoding='utf-8') as index_file:
+            if index_file.readline().rstrip('\n') == signature:
+                entries = []
+
+                for line in index_file:
+                    sent_id, offset, length, token_count = line.rstrip('\n').split('\t')
+                    entries.append((sent_id, int(offset), int(length), int(token_count)))
+
+                return entries
+
+    entries = build_conllu_index(path)
+
+    try:
+        with open(conllu_index_path(path), 'w', encoding='utf-8') as index_file:
+            index_file.write(signature + '\n')
+
+            for entry in entries:
+                index_file.write('{}\t{}\t{}\t{}\n'.format(*entry))
+
+    except OSError:
+        pass
+
+    return entries
+
+    # read_conllu_index() returns the entries of the index of a CoNLL-U file in the order of the file, building and writing the index if it is missing or out of date.
+    # an index which cannot be written, next to a file in a read-only directory for example, is built again on every run.
+
+def select_sentences(entries, ids=None, id_range=None, sample=None, min_length=None, max_length=None, seed=0):
+    positions = range(len(entries))
+    id_positions = {}
+    wanted_ids = []
+
+    if ids != None:
+        wanted_ids.extend(ids)
+
+    if id_range != None:
+        wanted_ids.extend(id_range)
+
+    if len(wanted_ids) != 0:
+        for position in positions:
+            id_positions.setdefault(entries[position][0], position)
+
+        missing_ids = [sent_id for sent_id in wanted_ids if sent_id not in id_positions]
+
+        if len(missing_ids) != 0:
+            raise KeyError('sent_ids not in the input: {}'.format(', '.join(missing_ids)))
+
+    if ids != None:
+        positions = sorted(set([id_positions[sent_id] for sent_id in ids]))
+
+    if id_range != None:
+        first_position, last_position = id_positions[id_range[0]], id_positions[id_range[1]]
+        positions = [position for position in positions if first_position <= position <= last_position]
+
+    if min_length != None:
+        positions = [position for position in positions if entries[position][3] >= min_length]
+
+    if max_length != None:
+        positions = [position for position in positions if entries[position][3] <= max_length]
+
+    positions = list(positions)
+
+    if sample != None and sample < len(positions):
+        positions = sorted(random.Random(seed).sample(positions, sample))
+
+    return positions
+
+    # select_sentences() returns the positions of the sentences which pass every filter it is given, in the order of the file.
+    # a range runs from the sentence with the first sent_id to the sentence with the last, both included, in the order of the file,
+    # lengths are numbers of tokens before filtering, and a sample is drawn from the sentences which pass the other filters, with a fixed seed so it can be drawn again.
+
+def read_blocks(path, entries, positions):
+    with open(path, 'rb') as conllu_file:
+        for position in positions:
+            sent_id, offset, length, token_count = entries[position]
+            conllu_file.seek(offset)
+
+            block = conllu_file.read(length).decode('utf-8').replace('\r\n', '\n')
+
+            if block.endswith('\n') == False:
+                block += '\n'
+
+            yield position + 1, block + '\n'
+
+    # read_blocks() yields the blocks of the selected sentences with their positions in the file (counting from 1), as read_sentence_blocks() would have cut them.
+    # the file is read as bytes, because the offsets are byte offsets, so windows line endings are turned into '\n' as reading it as text would,
+    # and the last sentence of a file which does not end with a newline is given one.
+
+def convert_subset(conllu_path, writer, options=None, ids=None, id_range=None, sample=None, min_length=None, max_length=None, seed=0, cache=None, stats=None, entries=None):
+    if entries == None:
+        entries = read_conllu_index(conllu_path)
+
+    positions = select_sentences(entries, ids, id_range, sample, min_length, max_length, seed)
+    convert_blocks(read_blocks(conllu_path, entries, positions), writer, options, cache, stats)
+
+    return len(positions)
+
+    # convert_subset() converts only the selected sentences of a CoNLL-U file, exactly as convert_stream() would have converted them, and returns how many there were.
+    # the entries of the file's index can be given if they have already been read.
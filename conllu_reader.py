@@ -0,0 +1,174 @@
+# a lightweight CoNLL-U reader, which can be used in place of the conllu library's parse() and parse_incr().
+# the converter only reads the id, form, lemma, upos, feats, head and deprel columns of a token, so the reader splits every line once
+# and keeps only those columns; the xpos, deps and misc columns are never stored.
+# the feats column is kept as its raw string and only parsed into a dictionary when a Token reads it (see. Token.feats in token_class.py),
+# which only happens for case tokens or when feature GFs are generated.
+# tokens are plain dictionaries with the same keys and the same values as the conllu library's, except for feats,
+# and sentences are lists of tokens with a metadata dictionary, like the conllu library's TokenLists.
+
+class Sentence(list):
+    __slots__ = ('metadata',)
+
+    def __init__(self, tokens, metadata):
+        list.__init__(self, tokens)
+        self.metadata = metadata
+
+def parse_feats(feats):
+    if feats == None or feats == '_' or feats == '':
+        return None
+
+    parsed_feats = {}
+
+    for feat in feats.split('|'):
+        name, separator, value = feat.partition('=')
+
+        if name == '' or name == '_':
+            continue
+
+        if separator == '':
+            parsed_feats[name] = ''
+
+        elif value == '' or value == '_':
+            parsed_feats[name] = None
+
+        else:
+            parsed_feats[name] = value
+
+    return parsed_feats
+
+    # feats are parsed exactly as the conllu library parses them, so a token has the same feats whichever reader it was read by.
+
+def parse_id(value):
+    if value.isdigit():
+        return int(value)
+
+    elif value == '_':
+        return None
+
+    elif '-' in value:
+        first, last = value.split('-')
+
+        return (int(first), '-', int(last))
+
+    elif '.' in value:
+        first, last = value.split('.')
+
+        return (int(first), '.', int(last))
+
+    raise ValueError('{} is not a valid id'.format(value))
+
+    # ids are integers, except for multiword tokens ('1-2') and empty nodes ('1.1'), which are tuples as in the conllu library.
+
+def parse_head(value):
+    if value == '_':
+        return None
+
+    return int(value)
+
+token_columns = [('id', 0, parse_id), ('form', 1, None), ('lemma', 2, None), ('upos', 3, None), ('feats', 5, None), ('head', 6, parse_head), ('deprel', 7, None)]
+
+# the columns the converter reads, with their positions in a token line and the functions they are parsed with, if any.
+
+def read_token(line):
+    columns = line.split('\t', 8)
+
+    if len(columns) < 8:
+        return read_malformed_token(columns)
+
+    try:
+        head = parse_head(columns[6])
+        token_id = parse_id(columns[0])
+
+    except ValueError:
+        return read_malformed_token(columns)
+
+    feats = None
+
+    if columns[5] != '_':
+        feats = columns[5]
+
+    return {
+        'id': token_id,
+        'form': columns[1],
+        'lemma': columns[2],
+        'upos': columns[3],
+        'feats': feats,
+        'head': head,
+        'deprel': columns[7]
+    }
+
+    # the line is split at most eight times, so the deps and misc columns are left in one piece at the end of it and thrown away.
+
+def read_malformed_token(columns):
+    token = {}
+
+    for name, position, parse_value in token_columns:
+        if position >= len(columns):
+            break
+
+        value = columns[position]
+
+        if name == 'feats' and value == '_':
+            value = None
+
+        elif parse_value != None:
+            try:
+                value = parse_value(value)
+
+            except ValueError:
+                pass
+
+        token[name] = value
+
+    return token
+
+    # a token line with too few columns is read like the conllu library reads it, into a token with only the columns it has;
+    # an id or head which is not a number is kept as it is written. either way the sentence fails in the conversion, and only that sentence,
+    # so that one malformed line cannot end the stream of a long-lived worker (see. run_worker() in converter.py).
+
+def read_sentence(block):
+    tokens = []
+    metadata = {}
+
+    for line in block.split('\n'):
+        line = line.strip()
+
+        if line == '':
+            continue
+
+        if line[0] == '#':
+            key, separator, value = line[1:].partition('=')
+            key, value = key.strip(), value.strip()
+
+            if separator == '=' and key != '' and value != '':
+                metadata[key] = value
+
+        else:
+            tokens.append(read_token(line))
+
+    return Sentence(tokens, metadata)
+
+    # comments of the form '# key = value' are kept as metadata; other comments are not needed by the converter.
+
+def read_conllu(data):
+    return list(read_conllu_incr(data.splitlines(True)))
+
+    # read_conllu() takes the place of the conllu library's parse() and returns a list of sentences.
+
+def read_conllu_incr(conllu_file):
+    block_lines = []
+
+    for line in conllu_file:
+        if line.strip() == '':
+            if len(block_lines) > 0:
+                yield read_sentence(''.join(block_lines))
+                block_lines = []
+
+        else:
+            block_lines.append(line)
+
+    if len(block_lines) > 0:
+        yield read_sentence(''.join(block_lines))
+
+    # read_conllu_incr() takes the place of the conllu library's parse_incr() and yields sentences one at a time.
+    # sentences are separated by empty lines, or by lines of only whitespace, as they are for the conllu library.
@@ -0,0 +1,172 @@
+import time
+import marshal
+import sqlite3
+import hashlib
+from token_class import deprel_rules
+from conllu_reader import parse_feats
+from f_structure_nodes import plain_f_structure
+
+# the conversion cache stores the f_structure of every filtered sentence it is given in an sqlite database on disk,
+# keyed by a hash of the columns of the sentence which the conversion reads and of the options it was converted with.
+# the same sentence converted with the same options is then read from the cache instead of being composed again.
+
+cache_version = 3
+
+# the cache version is part of every key; it must be increased whenever the conversion rules in the code change, so that old entries are no longer found.
+
+def options_fingerprint(options):
+    return repr((cache_version, options['compiled_feature_projection'], options['structure_sharing'], sorted(deprel_rules.items())))
+
+    # the compiled feature projection is empty unless feature GFs are generated, so it covers both of the options for feature GFs;
+    # structure sharing changes f_structures too. the other options only change how sentences are read or how f_structures are held in memory.
+
+def key_column(value):
+    if value == None or value == '':
+        return '_'
+
+    return value
+
+    # an empty column is spelled '_' in the key, whether a reader gave it as '_', as an empty string or as None.
+
+def sentence_key(filtered_sentence, fingerprint):
+    lines = [fingerprint]
+
+    for token in filtered_sentence:
+        feats = token.get('feats')
+
+        if type(feats) == str:
+            feats = parse_feats(feats)
+
+        if type(feats) == dict:
+            feats = '|'.join(['{}={}'.format(feat, feat_value) for feat, feat_value in sorted(feats.items())])
+
+        columns = [token['id']] + [key_column(value) for value in [token.get('form'), token.get('lemma'), token.get('upos'), feats, token.get('head'), token.get('deprel')]]
+        lines.append('\t'.join([str(column) for column in columns]))
+
+    return hashlib.sha1('\n'.join(lines).encode('utf-8')).hexdigest()
+
+    # only the columns which the conversion reads are hashed: id, form, lemma, upos, feats, head and deprel.
+    # unparsed feats from the reader in conllu_reader.py are parsed first, and empty columns are normalised (see. key_column()),
+    # so a sentence has the same key whichever reader it was read by.
+
+class ConversionCache:
+    def __init__(self, path, max_bytes=1073741824, commit_interval=256):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.commit_interval = commit_interval
+        self.hits = 0
+        self.misses = 0
+        self.uncommitted = 0
+        self.unchecked_bytes = 0
+        self.used_keys = []
+        self.options = None
+        self.fingerprint = None
+
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS f_structures (key TEXT PRIMARY KEY, value BLOB, size INTEGER, used REAL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS f_structures_used ON f_structures (used)')
+        self.connection.commit()
+
+        # the database is in write-ahead-log mode, so that the processes of a parallel run can share it.
+
+    def key(self, filtered_sentence, options):
+        if options is not self.options:
+            self.options = options
+            self.fingerprint = options_fingerprint(options)
+
+        return sentence_key(filtered_sentence, self.fingerprint)
+
+        # the fingerprint of the options is only worked out again when different options are used.
+
+    def get(self, key):
+        row = self.connection.execute('SELECT value FROM f_structures WHERE key = ?', (key,)).fetchone()
+
+        if row == None:
+            self.misses += 1
+
+            return False, None
+
+        self.hits += 1
+        self.used_keys.append(key)
+
+        return True, marshal.loads(row[0])
+
+        # get() returns whether the key was found and the cached f_structure, which is None for a sentence which could not be composed.
+        # the time an entry was last used is updated with the next commit rather than with a write for every hit.
+
+    def put(self, key, f_structure):
+        value = marshal.dumps(plain_f_structure(f_structure))
+        self.connection.execute('INSERT OR REPLACE INTO f_structures VALUES (?, ?, ?, ?)', (key, value, len(value), time.time()))
+        self.uncommitted += 1
+        self.unchecked_bytes += len(value)
+
+        if self.uncommitted >= self.commit_interval:
+            self.commit()
+
+    def commit(self):
+        used_time = time.time()
+
+        if len(self.used_keys) != 0:
+            self.connection.executemany('UPDATE f_structures SET used = ? WHERE key = ?', [(used_time, key) for key in self.used_keys])
+            self.used_keys = []
+
+        self.connection.commit()
+        self.uncommitted = 0
+
+        if self.unchecked_bytes * 16 >= self.max_bytes:
+            self.unchecked_bytes = 0
+            self.evict()
+
+        # the size of the cache is checked again, and the cache evicted down to max_bytes, every time a sixteenth of max_bytes has been added to it since the last check,
+        # so that it cannot grow past its size during a run. every process of a pool checks what it added itself, so a pool can only overshoot by a sixteenth per process.
+
+    def size(self):
+        entries, total_bytes = self.connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM f_structures').fetchone()
+
+        return entries, total_bytes
+
+    def evict(self):
+        self.commit()
+        entries, total_bytes = self.size()
+        evicted = 0
+
+        while total_bytes > self.max_bytes:
+            oldest = self.connection.execute('SELECT key, size FROM f_structures ORDER BY used LIMIT 1000').fetchall()
+
+            if len(oldest) == 0:
+                break
+
+            for key, size in oldest:
+                if total_bytes <= self.max_bytes:
+                    break
+
+                self.connection.execute('DELETE FROM f_structures WHERE key = ?', (key,))
+                total_bytes -= size
+                evicted += 1
+
+            self.connection.commit()
+
+        return evicted
+
+        # the least recently used entries are deleted, a thousand at a time, until the values in the cache fit in max_bytes again.
+
+    def report(self):
+        entries, total_bytes = self.size()
+        lookups = self.hits + self.misses
+        hit_rate = 0.0
+
+        if lookups != 0:
+            hit_rate = self.hits / lookups * 100
+
+        return 'cache: {} hits, {} misses ({:.1f}% hit rate), {} entries, {:.1f} MB'.format(self.hits, self.misses, hit_rate, entries, total_bytes / 1048576)
+
+    def close(self):
+        self.evict()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
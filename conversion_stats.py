@@ -0,0 +1,231 @@
+import sys
+import json
+import time
+
+# conversion statistics record where the time of a run goes and why sentences are not converted.
+# the time of every stage of the conversion is added up, the time to convert every sentence is kept in a histogram by its number of tokens,
+# and every sentence which is not converted is counted under its reason: the deprel which rejected it (see. no_equivalents['sentence'] in token_class.py),
+# a head structure which is not a tree (see. repair_heads() in converter.py), too many tokens, a missing matrix predicate or an error in the conversion.
+
+stages = ['prefilter', 'parse', 'parse_filter', 'cache', 'f_compose', 'validate', 'serialize', 'write']
+
+token_buckets = [10, 20, 40, 80, 160]
+
+# a sentence is counted in the first bucket its number of tokens fits in, or in the last, open bucket if it is longer than 160 tokens.
+
+def bucket_name(bucket):
+    if bucket == 0:
+        return '1-{}'.format(token_buckets[0])
+
+    elif bucket < len(token_buckets):
+        return '{}-{}'.format(token_buckets[bucket - 1] + 1, token_buckets[bucket])
+
+    return '{}+'.format(token_buckets[-1] + 1)
+
+def token_bucket(token_count):
+    for bucket in range(len(token_buckets)):
+        if token_count <= token_buckets[bucket]:
+            return bucket
+
+    return len(token_buckets)
+
+class ConversionStats:
+    def __init__(self, progress_interval=None, progress_stream=None):
+        self.start_time = time.perf_counter()
+        self.sentences = 0
+        self.converted = 0
+        self.tokens = 0
+        self.stage_seconds = {stage: 0.0 for stage in stages}
+        self.rejections = {}
+        self.repairs = {}
+        self.latency_counts = [0] * (len(token_buckets) + 1)
+        self.latency_seconds = [0.0] * (len(token_buckets) + 1)
+        self.latency_max = [0.0] * (len(token_buckets) + 1)
+        self.string_lookups = 0
+        self.string_hits = 0
+        self.pooled_strings = 0
+        self.pooled_bytes = 0
+        self.validated = 0
+        self.ill_formed = 0
+        self.well_formedness_errors = {}
+
+        self.progress_interval = progress_interval
+        self.progress_stream = progress_stream
+        self.last_progress_time = self.start_time
+        self.last_progress_sentences = 0
+
+        # the statistics are plain numbers, lists and dictionaries, so that the statistics of a chunk converted in another process can be sent back and merged.
+        # progress is written to stderr unless another stream is given.
+
+    def add_time(self, stage, seconds):
+        self.stage_seconds[stage] += seconds
+
+    def reject(self, reason):
+        self.rejections[reason] = self.rejections.get(reason, 0) + 1
+
+    def repair(self, reason):
+        self.repairs[reason] = self.repairs.get(reason, 0) + 1
+
+        # a repaired sentence is converted, but only after its annotation was changed, like a token with a dangling head being reattached.
+
+    def sentence_done(self, token_count, seconds, converted):
+        self.sentences += 1
+        self.tokens += token_count
+
+        if converted == True:
+            self.converted += 1
+
+        bucket = token_bucket(token_count)
+        self.latency_counts[bucket] += 1
+        self.latency_seconds[bucket] += seconds
+
+        if seconds > self.latency_max[bucket]:
+            self.latency_max[bucket] = seconds
+
+        if self.progress_interval != None:
+            self.progress()
+
+        # the latency of a sentence is the time it took to filter and convert it, with any time spent in the cache, but not to parse or write it.
+
+    def well_formedness_checked(self, errors):
+        self.validated += 1
+
+        if len(errors) != 0:
+            self.ill_formed += 1
+
+        for error_type, gf in errors:
+            self.well_formedness_errors[error_type] = self.well_formedness_errors.get(error_type, 0) + 1
+
+        # errors are the pairs of error type and GF returned by well_formedness_errors() (see. well_formedness.py), and are counted by their type.
+
+    def record_string_pool(self, pool, lookups_before=0, hits_before=0):
+        self.string_lookups += pool.lookups - lookups_before
+        self.string_hits += pool.hits - hits_before
+        self.pooled_strings = max(self.pooled_strings, len(pool.strings))
+        self.pooled_bytes = max(self.pooled_bytes, pool.pooled_bytes)
+
+        # the lookups and hits of the string pool (see. string_pool.py) since lookups_before and hits_before are added up,
+        # but the size of the pool is the largest any process had, because every process has its own pool which lasts for the whole run.
+
+    def merge(self, other):
+        self.sentences += other.sentences
+        self.converted += other.converted
+        self.tokens += other.tokens
+
+        for stage in stages:
+            self.stage_seconds[stage] += other.stage_seconds[stage]
+
+        for reason, count in other.rejections.items():
+            self.rejections[reason] = self.rejections.get(reason, 0) + count
+
+        for reason, count in other.repairs.items():
+            self.repairs[reason] = self.repairs.get(reason, 0) + count
+
+        for bucket in range(len(token_buckets) + 1):
+            self.latency_counts[bucket] += other.latency_counts[bucket]
+            self.latency_seconds[bucket] += other.latency_seconds[bucket]
+            self.latency_max[bucket] = max(self.latency_max[bucket], other.latency_max[bucket])
+
+        self.string_lookups += other.string_lookups
+        self.string_hits += other.string_hits
+        self.pooled_strings = max(self.pooled_strings, other.pooled_strings)
+        self.pooled_bytes = max(self.pooled_bytes, other.pooled_bytes)
+        self.validated += other.validated
+        self.ill_formed += other.ill_formed
+
+        for error_type, count in other.well_formedness_errors.items():
+            self.well_formedness_errors[error_type] = self.well_formedness_errors.get(error_type, 0) + count
+
+        if self.progress_interval != None:
+            self.progress()
+
+        # the stage times of a parallel run are added up over its processes, so together they can be longer than the run itself.
+
+    def progress(self):
+        now = time.perf_counter()
+
+        if now - self.last_progress_time < self.progress_interval:
+            return
+
+        interval_rate = (self.sentences - self.last_progress_sentences) / (now - self.last_progress_time)
+        progress_stream = self.progress_stream
+
+        if progress_stream == None:
+            progress_stream = sys.stderr
+
+        progress_stream.write('{} sentences, {:.0f} sentences/s over the last {:.0f}s, {:.0f} sentences/s overall, {:.2f}% converted\n'.format(
+            self.sentences, interval_rate, now - self.last_progress_time, self.sentences / (now - self.start_time), self.success_rate()))
+        progress_stream.flush()
+
+        self.last_progress_time = now
+        self.last_progress_sentences = self.sentences
+
+        # the rate over the last interval is printed beside the overall rate, so that a drop in throughput shows as soon as it happens.
+
+    def success_rate(self):
+        if self.sentences == 0:
+            return 0.0
+
+        return self.converted / self.sentences * 100
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.start_time
+        latency = {}
+
+        for bucket in range(len(token_buckets) + 1):
+            if self.latency_counts[bucket] != 0:
+                latency[bucket_name(bucket)] = {
+                    'sentences': self.latency_counts[bucket],
+                    'mean_ms': round(self.latency_seconds[bucket] / self.latency_counts[bucket] * 1000, 3),
+                    'max_ms': round(self.latency_max[bucket] * 1000, 3)
+                }
+
+        return {
+            'sentences': self.sentences,
+            'converted': self.converted,
+            'rejected': self.sentences - self.converted,
+            'success_rate': round(self.success_rate(), 2),
+            'tokens': self.tokens,
+            'elapsed_seconds': round(elapsed, 3),
+            'sentences_per_second': round(self.sentences / max(elapsed, 1e-9), 1),
+            'tokens_per_second': round(self.tokens / max(elapsed, 1e-9), 1),
+            'stage_seconds': {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()},
+            'rejections': dict(sorted(self.rejections.items(), key=lambda item: -item[1])),
+            'repairs': dict(sorted(self.repairs.items(), key=lambda item: -item[1])),
+            'latency_by_tokens': latency,
+            'string_pool': {
+                'strings': self.pooled_strings,
+                'megabytes': round(self.pooled_bytes / 1048576, 3),
+                'lookups': self.string_lookups,
+                'hit_rate': round(self.string_hits / max(self.string_lookups, 1) * 100, 2)
+            },
+            'well_formedness': {
+                'checked': self.validated,
+                'ill_formed': self.ill_formed,
+                'errors': dict(sorted(self.well_formedness_errors.items(), key=lambda item: -item[1]))
+            }
+        }
+
+    def well_formedness_report(self):
+        errors = ', '.join(['{} {}'.format(count, error_type) for error_type, count in sorted(self.well_formedness_errors.items(), key=lambda item: -item[1])])
+
+        if errors == '':
+            errors = 'no errors'
+
+        return 'well-formedness: {} of {} f-structures ill-formed ({})'.format(self.ill_formed, self.validated, errors)
+
+    def write_summary(self, path, summary=None):
+        if summary == None:
+            summary = self.summary()
+
+        summary = json.dumps(summary, indent=2)
+
+        if path == '-':
+            sys.stderr.write(summary + '\n')
+
+        else:
+            with open(path, 'w', encoding='utf-8') as summary_file:
+                summary_file.write(summary + '\n')
+
+        # a summary written to '-' goes to stderr, so that it is never mixed into f_structures written to stdout.
+        # a report which holds the summary, like the report of a corpus conversion (see. corpus.py), can be written in its place.
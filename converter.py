@@ -0,0 +1,974 @@
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing import Pool
+from conllu import *
+from token_class import *
+from f_structure_io import *
+from conversion_cache import ConversionCache
+from conversion_stats import ConversionStats
+from conllu_reader import read_conllu, read_conllu_incr
+from f_structure_nodes import *
+from string_pool import string_pool
+from well_formedness import well_formedness_errors
+
+# the conllu library parses the file into sentences and each sentence into tokens; each token is a dictionary with with the following keys:
+# id, form, lemma, upos, xpos, feats, head, deprel, deps, misc.
+# the Token class is a class of object in which relevant data is stored and methods for conversion are defined.
+
+def parse_filter(sentence):
+    filtered_sentence = []
+    
+    for token in sentence:
+        filter_action = filter_actions.get(token['deprel'])
+
+        if filter_action == None:
+            filtered_sentence.append(token)
+
+            # any token with a deprel which is not filtered is appended to the filtered sentence, which is ready to be converted to an f_structure.
+
+        elif filter_action == 'reject':
+            return False
+
+            # if the sentence has a token in it with a deprel value in the list no_equivalents['sentence'], it is not parsable.
+            # deprels in this set are part of UD but deemed unparsable by the engineer.
+            # otherwise the token has a deprel value in the list no_equivalents['token'] and is ignored.
+
+    return filtered_sentence
+
+    # note that parse_filter requires the filter actions compiled from the deprel rules in token_class.py, also imported.
+
+def rejecting_deprel(sentence):
+    for token in sentence:
+        if filter_actions.get(token['deprel']) == 'reject':
+            return token['deprel']
+
+    return None
+
+    # rejecting_deprel() returns the deprel for which parse_filter() rejects a sentence, the first in the sentence from no_equivalents['sentence'].
+
+def prefilter_block(block):
+    kept_lines = []
+    dropped_heads = []
+    kept_tokens = 0
+
+    for line in block.split('\n'):
+        if line != '' and line[0] != '#':
+            kept_tokens += 1
+            columns = line.split('\t', 8)
+
+            if len(columns) > 7:
+                filter_action = filter_actions.get(columns[7])
+
+                if filter_action == 'reject':
+                    return None, columns[7], None
+
+                elif filter_action == 'ignore':
+                    dropped_heads.append((columns[0], columns[6]))
+                    kept_tokens -= 1
+
+                    continue
+
+        kept_lines.append(line)
+
+    if kept_tokens == 0:
+        return None, None, dropped_heads
+
+    return '\n'.join(kept_lines), None, dropped_heads
+
+    # prefilter_block() applies parse_filter() to the raw text of a sentence by reading only the DEPREL column of its lines, before the sentence is parsed.
+    # it returns None and the rejecting deprel for a sentence which parse_filter() would reject, and otherwise the text without the lines of ignored tokens,
+    # so that the conllu library never parses a sentence which is thrown away or a token which is dropped.
+    # the ids and heads of the dropped tokens are returned third, unparsed, so that repair_heads() can still walk up through them.
+    # a sentence with no token lines left, all of them dropped, is returned as None without a deprel, because it has no root to be converted from.
+
+def repair_heads(filtered_sentence, sentence, orphans='reattach', dropped_heads=()):
+    kept_tokens = {}
+    root_id = None
+    root_count = 0
+
+    for token in filtered_sentence:
+        if type(token['id']) == int and token['head'] != None:
+            kept_tokens[token['id']] = token
+
+            if token['head'] == 0:
+                root_id = token['id']
+                root_count += 1
+
+    if root_count == 0:
+        return None, 'no root'
+
+    elif root_count > 1:
+        return None, 'multiple roots'
+
+    # multiword tokens and empty nodes have no head, and are not part of the tree.
+
+    original_heads = None
+    problem = None
+
+    for position in range(len(filtered_sentence)):
+        token = filtered_sentence[position]
+
+        if token['id'] not in kept_tokens or token['head'] == 0 or token['head'] in kept_tokens:
+            continue
+
+        if orphans == 'reject':
+            return None, 'dangling head'
+
+        if original_heads == None:
+            original_heads = {}
+
+            for original_token in sentence:
+                original_heads[original_token['id']] = original_token['head']
+
+            for token_id, token_head in dropped_heads:
+                if token_id.isdigit() == True and token_head.isdigit() == True:
+                    original_heads[int(token_id)] = int(token_head)
+
+        # the original heads are those of the sentence as it was parsed, and of the tokens dropped from its text before it was parsed (see. prefilter_block()), if any.
+
+        head = token['head']
+        steps = 0
+
+        while head not in kept_tokens and head in original_heads and head != 0 and steps < len(original_heads):
+            head = original_heads[head]
+            steps += 1
+
+        if head not in kept_tokens or head == token['id']:
+            head = root_id
+
+        filtered_sentence[position] = dict(token, head=head)
+        kept_tokens[token['id']] = filtered_sentence[position]
+        problem = 'dangling head'
+
+    # a dangling head is the head of a token which parse_filter() has removed, like a punctuation mark, or which is not in the sentence at all.
+    # if orphans is 'reattach', the default, a token with a dangling head is reattached to its nearest ancestor in the original sentence which was kept,
+    # or to the root if it has none; the token is copied, so the parsed sentence is left as it was. if it is 'reject', a sentence with a dangling head is rejected.
+    # reattaching is the default because the conversion before these checks converted such sentences, only leaving their orphaned tokens out.
+
+    states = {}
+
+    for token_id in kept_tokens:
+        path = []
+        current_id = token_id
+
+        while current_id != 0 and current_id not in states:
+            states[current_id] = 'visiting'
+            path.append(current_id)
+            current_id = kept_tokens[current_id]['head']
+
+        if current_id != 0 and states[current_id] == 'visiting':
+            return None, 'head cycle'
+
+        for path_id in path:
+            states[path_id] = 'done'
+
+    # every token is walked up towards the root until it reaches the root or a token already walked, and every token is walked once, so the check is linear.
+    # reaching a token on the walk itself is a cycle, which no reattachment can repair, so the sentence is rejected.
+
+    return filtered_sentence, problem
+
+    # repair_heads() checks that the filtered tokens of a sentence form a tree: one root, no dangling heads and no cycles.
+    # it returns the sentence, with any orphaned tokens reattached, and 'dangling head' if any were, or None and the reason the sentence was rejected.
+    # a sentence which passes can be composed by f_compose() in linear time, and no token of it is silently left out.
+
+def block_token_count(block):
+    token_count = 0
+
+    for line in block.split('\n'):
+        if line != '' and line[0] != '#':
+            token_count += 1
+
+    return token_count
+
+def block_sent_id(block, ordinal):
+    for line in block.split('\n'):
+        if line.startswith('#'):
+            key, separator, value = line[1:].partition('=')
+
+            if separator == '=' and key.strip() == 'sent_id':
+                return value.strip()
+
+        elif line != '':
+            break
+
+    return str(ordinal)
+
+    # the sent_id is read from the comments of the block without parsing it, and is the position of the sentence in the file if there is none.
+
+def f_hierarchy(token):
+    return token.rank
+
+    # the rank of a token on the functional hierarchy is looked up from its deprel when the token is created (see. deprel_rules in token_class.py):
+    # SUBJ is ranked 0, OBJ 1, OBJ:IND 2, OBL 3, COMP and XCOMP 4, ADJ 7 and every other GF 5.
+
+def nest_order(tokens):
+    dependants_by_head = {}
+
+    for token in tokens:
+        if token.head in dependants_by_head:
+            dependants_by_head[token.head].append(token)
+
+        else:
+            dependants_by_head[token.head] = [token]
+
+        # every token is listed under the id of its head in one pass over the sentence, keeping the order of the sentence.
+
+    matrix_pred = None
+
+    for token in tokens:
+        if token.id in dependants_by_head:
+            token.dependants.extend(dependants_by_head[token.id])
+            token.dependants.sort(key=f_hierarchy)
+
+            # the tokens' .dependants properties are looked up by their id and sorted according to the functional hierarchy,
+            # with a special place for coordinating conjunctions and parataxis at the end (see. f_hierarchy()).
+
+        else:
+            pred_format(token)
+
+            # the terminal dependants have their preds formatted.
+
+        if token.head == 0:
+            matrix_pred = token
+
+            # the matrix predicate is found.
+
+    if matrix_pred == None:
+        return []
+
+        # a sentence without a matrix predicate cannot be nested, and f_compose() returns None for it.
+
+    ordered_tokens = [matrix_pred]
+    position = 0
+
+    while position < len(ordered_tokens):
+        ordered_tokens.extend(ordered_tokens[position].dependants)
+        position += 1
+
+        # the matrix predicate is the first token in the ordered list, and every token in the list has its dependants added to the end of it in turn.
+        # this is a breadth-first walk of the tree: the matrix predicate's dependants come first, then their dependants and so on.
+
+    ordered_heads = []
+
+    for token in reversed(ordered_tokens):
+        if len(token.dependants) != 0:
+            ordered_heads.append(token)
+
+    # the ordered_tokens list has the terminal dependants removed and its order is reversed to reflect the nesting order for f_compose().
+    # ordered_tokens is now a list of every token which is the head of another token, ordered from the heads of the terminal dependants to the matrix predicate.
+    # this order ensures that no token can nest its dependants inside its value until they have had their turn to nest their dependants and so on.
+    # every step visits each token a fixed number of times, so the cost of nest_order() grows linearly with the length of the sentence.
+
+    return ordered_heads
+
+def pred_format(token):
+    exception_preds = ['DEF', 'CASE', 'GEN', 'PERS', 'MOOD', 'TENSE', 'NUM', 'ASP', 'COORD', '*CPOUND']
+
+    if token.upos == 'PRON' and token.gf != 'SPEC':
+        token.value.avm()['PRED'] = 'PRO'
+
+        # if the token is a pronoun and not a specifier, its PRED value must be PRO.
+
+    elif len(token.arguments) != 0 and token.gf not in exception_preds:
+        open_arg, close_arg = token.value.avm()['PRED'].split(' ')
+        arg_string = ''
+
+        # if the token has arguments and is not an ADJ, open_arg and close_arg are fragments of the original PRED value.
+        # the PRED of a set is the PRED of its first member (see. f_structure_nodes.py).
+
+        for argument in token.arguments:
+            if argument != '*SUBJ':
+                arg_string = arg_string + '(' + argument + ')'
+
+        token.value.avm()['PRED'] = open_arg + arg_string + close_arg
+
+        # the new PRED value is formatted to include the names of the argument grammatical functions and added.
+
+    else:
+        if token.gf not in exception_preds:
+            token.value.avm()['PRED'] = token.lemma
+
+        # if the token has no arguments its PRED value is equal to its lemma, unless it is a special PRED value for GFs like DEF or CASE or a pronoun.
+    
+    # it is presumed that all ADJ and *COORD PREDs will be formatted before they are coordinated, if that is required (see. f_compose());
+    # this function is only designed to be called when the ADJ or *COORD has just one item in its list.
+
+def controlled_xcomps(tokens):
+    tokens_by_id = {}
+    subject_heads = set()
+
+    for token in tokens:
+        tokens_by_id[token.id] = token
+
+        if token.gf == 'SUBJ':
+            subject_heads.add(token.head)
+
+    controlled_ids = set()
+
+    for token in tokens:
+        xcomp = token
+        chain_length = 0
+
+        while xcomp != None and xcomp.gf == 'XCOMP' and xcomp.id not in subject_heads and chain_length < len(tokens):
+            if xcomp.head in subject_heads:
+                controlled_ids.add(token.id)
+
+                break
+
+            xcomp = tokens_by_id.get(xcomp.head)
+            chain_length += 1
+
+    return controlled_ids
+
+    # controlled_xcomps() returns the ids of the open complements whose subject is controlled: those without a subject of their own
+    # whose head has a subject, or whose head is itself a controlled open complement, as in chains of raising verbs.
+    # the length of a chain is limited by the length of the sentence, so a corrupted tree with a cycle in it cannot loop forever.
+
+# in sum, these four functions are the toolkit for f_compose(), which returns f_structures for sentences in the HDT-UD.
+# parse_filter() allows or disallows and trims the sentences for conversion, f_hierarchy orders GFs on the functional hierarchy,
+# nest_order calculates the correct order of nesting for the GFs and pred_format edits the values of the PRED GFs to list the arguments of the function or to otherwise be simplified.
+
+default_options = {
+    'generate_feat_gfs': False,
+    'feature_projection': default_feature_projection,
+    'reader': 'conllu',
+    'structure_sharing': False,
+    'hash_cons': False,
+    'intern_strings': False,
+    'validate': False,
+    'orphans': 'reattach',
+    'max_tokens': None
+}
+
+# the options decide how a sentence is read and converted; any option left out of an options dictionary takes its default value.
+# with structure sharing, the subject of a controlled open complement is the same node as the subject of its controller (see. f_compose()),
+# and with hash-consing, identical leaf AVMs are kept once for every f_structure converted by the process (see. hash_cons() in f_structure_nodes.py).
+# with string interning, every string in an f_structure is replaced by the one copy of it in the process's string pool (see. string_pool.py).
+# both only save memory when the f_structures are kept in memory, and their pools last as long as the process and only grow,
+# so they are off by default and are left to programs which keep f_structures, not offered by the command line, which writes them out as it goes.
+# with validation, every f_structure is checked for well-formedness (see. well_formedness.py) and its errors are counted in the conversion statistics.
+# tokens whose head was filtered out are reattached, or their sentences rejected if orphans is 'reject' (see. repair_heads()),
+# and sentences with more than max_tokens tokens after filtering are rejected, so that no sentence can take much longer than the rest.
+
+hash_cons_pool = {}
+
+readers = {
+    'conllu': (parse, parse_incr),
+    'fast': (read_conllu, read_conllu_incr)
+}
+
+# every reader is a pair of functions, one which parses a string into a list of sentences and one which parses a file one sentence at a time.
+# 'conllu' is the conllu library, and 'fast' the reader in conllu_reader.py, which only keeps the columns the converter needs.
+
+def compile_options(options=None):
+    compiled_options = dict(default_options)
+
+    if options != None:
+        compiled_options.update(options)
+
+    if compiled_options['generate_feat_gfs'] == True:
+        compiled_options['compiled_feature_projection'] = compile_feature_projection(compiled_options['feature_projection'])
+
+    else:
+        compiled_options['compiled_feature_projection'] = ()
+
+    return compiled_options
+
+    # the options are compiled once per run, so that the feature projection is not rebuilt for every sentence.
+    # functions which are given options which have not been compiled compile them themselves.
+
+def f_compose(sentence, options=None):
+    if options == None or 'compiled_feature_projection' not in options:
+        options = compile_options(options)
+
+    tokens = []
+    obl_counter = 0
+    obj_counter = 1
+
+    for token in sentence:
+        token_object = Token(token)
+        token_object.convert(options['compiled_feature_projection'])
+        tokens.append(token_object)
+
+        # the sentence's tokens are cast as objects of the type above, converted and listed.
+
+    controlled_ids = set()
+
+    if options['structure_sharing'] == True:
+        controlled_ids = controlled_xcomps(tokens)
+
+        for token in tokens:
+            if token.id in controlled_ids:
+                del token.value.avm()['SSUBJ']
+                token.arguments.append('SUBJ')
+
+        # a controlled open complement has its controlled subject as an argument before any of its own, and loses the placeholder '(SUBJ^)'.
+
+    tokens = nest_order(tokens)
+
+    # the tokens list now contains every token which is the head of another token, with a list of their dependants as a property, ordered for composition.
+    # every value is an AVM or a set of AVMs (see. f_structure_nodes.py), and GFs are nested in the AVM returned by its .avm() method,
+    # which is the value itself for an AVM and the token's own AVM, the first member, for a set.
+
+    for token in tokens:
+        for dependant in token.dependants:
+            key, value = dependant.gf, dependant.value
+
+            if dependant.gf == '*COORD':
+                coordination_list = FSet()
+
+                if type(token.value) == FSet:
+                    coordination_list.extend(token.value)
+
+                else:
+                    coordination_list.append(token.value)
+
+                coordination_list.extend(dependant.value)
+                token.value = coordination_list
+                
+                # if the dependant is a coordinated conjuntion or parataxis,
+                # the value(s) of the token must be placed inside a set with the coordinated conjunction or parataxis.
+
+            elif dependant.gf == 'COORD':
+                token.value.avm()['COORD'] = value
+                    
+                # if the dependant is a COORD, it must be the dependant of a coordinated conjunction and is nested appropriately.
+                # this may result in replacing the default COORD function values 'PARATAXIS' and 'LIST' (see. Token.convert_coordinants()).
+                
+            elif dependant.gf == '*CPOUND':
+                compound_token = dependant.value.avm()['PRED']
+
+                if compound_token[0] == '-':
+                    new_pred = token.lemma + compound_token
+
+                else:
+                    new_pred = compound_token + token.lemma
+
+                token.value.avm()['PRED'] = '{}< >'.format(new_pred)
+                token.form = '{}'.format(new_pred)
+                token.lemma = '{}'.format(new_pred)
+
+                # if the dependant is part of a compound, it is placed at either the beginning or the end of the token's PRED value string.
+            
+            elif dependant.gf == '*SUBJ':
+                token.value.avm()['PRED'] = token.value.avm()['PRED'] + '(SUBJ)'
+
+                # if the dependant is an expletive subject, it is placed at the end of the token's PRED value string, outside the angled brackets.
+
+            elif dependant.gf == 'ADJ':
+                token_avm = token.value.avm()
+
+                if 'ADJ' in token_avm:
+                    token_avm['ADJ'].extend(value)
+
+                else:
+                    token_avm[key] = value
+
+                # if the dependant's GF is an ADJ, a check is performed to see if an ADJ function is already nested inside the token's value.
+                # if there is one, the new ADJ value(s) is (are) added to the original ADJ's set. if there isn't, the dependant's key and value are nested inside the token's value.
+            
+            elif dependant.gf == 'OBL':
+                obl_counter += 1
+                obl_theme = False
+
+                for deep_dependant in dependant.dependants:
+                    if deep_dependant.gf == 'CASE':
+                        dependant.gf = 'OBL:{}'.format(deep_dependant.form.upper())
+                            
+                        obl_theme = True
+
+                if obl_theme == False:
+                    dependant.gf = 'OBL:{}'.format(obl_counter)
+
+                token.value.avm()[dependant.gf] = dependant.value
+
+                # if the dependant's GF is an ADJ, a check is performed to see if an OBL function is already nested inside the token's value.
+                # if there is one, the new OBL function has its self.gf property renamed to ensure that it is distinct from any other OBLs in composition.
+
+            elif dependant.gf == 'OBJ':
+                token_avm = token.value.avm()
+
+                if 'OBJ' in token_avm:
+                    obj_counter += 1
+                    obj_theme = False
+
+                    for deep_dependant in dependant.dependants:
+                        if deep_dependant.gf == 'CASE':
+                            dependant.gf = 'OBJ:{}'.format(deep_dependant.form.upper())
+                            obj_theme = True
+
+                    if obj_theme == False:
+                        dependant.gf = 'OBJ:{}'.format(obj_counter)
+
+                        token_avm[dependant.gf] = dependant.value
+                
+                else:
+                    token_avm['OBJ'] = dependant.value
+
+                # if the dependant's GF is an ADJ, a check is performed to see if an OBL function is already nested inside the token's value.
+                # if there is one, the new OBL function has its self.gf property renamed to ensure that it is distinct from any other OBLs in composition.
+
+            else:
+                if key != '*SUBJ':
+                    token.value.avm()[key] = value
+                            
+                # if the dependant is none of the above (if it is simple), and not an expletive subject,
+                # the dependant's key and value are nested inside the token's value (or inside the first member of a set as above).
+            
+            if dependant.arg == True:
+                token.arguments.append(dependant.gf)
+
+                # if the dependant token is an argument, its gf is added to its head's list of arguments for pred_format().
+
+        pred_format(token)
+
+        # the pred value of the token is formatted to list its arguments if it has any, and to be simplified if it does not.
+
+    if len(controlled_ids) != 0:
+        for token in reversed(tokens):
+            for dependant in token.dependants:
+                if dependant.id in controlled_ids:
+                    dependant.value.avm()['SUBJ'] = token.value.avm()['SUBJ']
+
+        # the SUBJ of a controlled open complement is its controller's SUBJ node itself, not a copy, so the f_structure is reentrant.
+        # the heads are visited from the matrix predicate down, so the subject of an open complement is shared before it is shared on to the next in a chain.
+
+    matrix_pred = None
+
+    for token in tokens:
+        if token.head == 0:
+            matrix_pred = token
+
+    # the matrix predicate is located if it is recorded in the HDT-UD (i believe there are some sentences where this is corrupted).
+
+    if matrix_pred != None:
+        return pool_f_structure(AVM({matrix_pred.gf: matrix_pred.value}), options)
+
+    # every token's conversion to a GF is nested inside the value of its head, and the matrix predicate is nested inside the empty f_structure.
+    # because of nest_order(), no GF can be left out of this composition.
+    # the nodes of the f_structure are dictionaries and lists, so it prints and is written as JSON exactly as a plain f_structure would be;
+    # it is only copied into plain dictionaries and lists where that is needed, for the marshal module (see. plain_f_structure()).
+
+def pool_f_structure(f_structure, options):
+    if options['intern_strings'] == True:
+        string_pool.intern_f_structure(f_structure)
+
+    if options['hash_cons'] == True:
+        f_structure = hash_cons(f_structure, hash_cons_pool, shared_nodes(f_structure))
+
+    return f_structure
+
+    # pool_f_structure() shares the strings and leaf AVMs of an f_structure with every other f_structure of the process, if the options ask for it.
+    # it is applied to every f_structure a sentence is converted to, whether it was composed or read from the conversion cache.
+
+def convert_sentence(sentence, options=None, cache=None, stats=None, dropped_heads=()):
+    if stats != None:
+        return convert_sentence_instrumented(sentence, options, cache, stats, dropped_heads)
+
+    if options == None or 'compiled_feature_projection' not in options:
+        options = compile_options(options)
+
+    try:
+        filtered_sentence = parse_filter(sentence)
+
+        if type(filtered_sentence) != list:
+            return None
+
+        # if the sentence is returned by parse_filter, it has no punctuation, particles or markers.
+
+        if options['max_tokens'] != None and len(filtered_sentence) > options['max_tokens']:
+            return None
+
+        filtered_sentence = repair_heads(filtered_sentence, sentence, options['orphans'], dropped_heads)[0]
+
+    except Exception:
+        return None
+
+    if filtered_sentence == None:
+        return None
+
+    # if its heads form a tree, once any orphaned tokens are reattached, it is ready to be converted into an f-structure.
+
+    if cache != None:
+        cache_key = cache.key(filtered_sentence, options)
+        cached, f_structure = cache.get(cache_key)
+
+        if cached == True:
+            if f_structure != None:
+                f_structure = pool_f_structure(f_structure, options)
+
+            return f_structure
+
+    try:
+        f_structure = f_compose(filtered_sentence, options)
+
+    except Exception:
+        return None
+
+    if cache != None:
+        cache.put(cache_key, f_structure)
+
+    return f_structure
+
+    # convert_sentence() is the entry point for converting a single sentence, as parsed by the conllu library, into an f_structure.
+    # it returns None for any sentence which cannot be converted, including a sentence which raises an error while it is filtered or composed,
+    # so that one malformed sentence cannot end a run; such a sentence is not cached.
+    # if a conversion cache is given (see. conversion_cache.py), f_compose() is skipped for any sentence which has been converted with the same options before.
+    # if conversion statistics are given (see. conversion_stats.py), the sentence is converted by convert_sentence_instrumented() instead.
+    # a sentence parsed from prefiltered text is given the heads of the tokens which were dropped from it (see. prefilter_block()), for repair_heads().
+
+def convert_sentence_instrumented(sentence, options, cache, stats, dropped_heads=()):
+    if options == None or 'compiled_feature_projection' not in options:
+        options = compile_options(options)
+
+    sentence_start = time.perf_counter()
+    problem = None
+
+    try:
+        filtered_sentence = parse_filter(sentence)
+
+        if type(filtered_sentence) != list:
+            problem = 'deprel {}'.format(rejecting_deprel(sentence))
+
+        elif options['max_tokens'] != None and len(filtered_sentence) > options['max_tokens']:
+            filtered_sentence = None
+            problem = 'over budget'
+
+        else:
+            filtered_sentence, problem = repair_heads(filtered_sentence, sentence, options['orphans'], dropped_heads)
+
+    except Exception:
+        filtered_sentence = None
+        problem = 'conversion error'
+
+    filter_end = time.perf_counter()
+    stats.add_time('parse_filter', filter_end - sentence_start)
+
+    if type(filtered_sentence) != list:
+        stats.reject(problem)
+        stats.sentence_done(len(sentence), filter_end - sentence_start, False)
+
+        return None
+
+    if problem != None:
+        stats.repair(problem)
+
+    if cache != None:
+        cache_key = cache.key(filtered_sentence, options)
+        cached, f_structure = cache.get(cache_key)
+        cache_end = time.perf_counter()
+        stats.add_time('cache', cache_end - filter_end)
+
+        if cached == True:
+            if f_structure == None:
+                stats.reject('missing matrix predicate')
+
+            else:
+                f_structure = pool_f_structure(f_structure, options)
+
+                if options['validate'] == True:
+                    validate(f_structure, stats)
+
+            stats.sentence_done(len(sentence), cache_end - sentence_start, f_structure != None)
+
+            return f_structure
+
+        # only sentences without a matrix predicate are cached as None, because sentences which raise an error are not cached.
+
+    compose_start = time.perf_counter()
+
+    try:
+        f_structure = f_compose(filtered_sentence, options)
+
+    except Exception:
+        compose_end = time.perf_counter()
+        stats.add_time('f_compose', compose_end - compose_start)
+        stats.reject('conversion error')
+        stats.sentence_done(len(sentence), compose_end - sentence_start, False)
+
+        return None
+
+    compose_end = time.perf_counter()
+    stats.add_time('f_compose', compose_end - compose_start)
+
+    if f_structure == None:
+        stats.reject('missing matrix predicate')
+
+    elif options['validate'] == True:
+        validate(f_structure, stats)
+
+    if cache != None:
+        cache_start = time.perf_counter()
+        cache.put(cache_key, f_structure)
+        stats.add_time('cache', time.perf_counter() - cache_start)
+
+    stats.sentence_done(len(sentence), time.perf_counter() - sentence_start, f_structure != None)
+
+    return f_structure
+
+    # convert_sentence_instrumented() converts a sentence as convert_sentence() does, timing each of its stages
+    # and recording why the sentence was not converted if it was not, or which of its heads were repaired if they were.
+    # a sentence which raises an error while it is filtered or composed is skipped, as it is by convert_sentence(), and counted as a conversion error.
+    # the time to check the heads of a sentence is counted as part of parse_filter.
+    # it is kept apart from convert_sentence() so that a run without statistics does not pay for them.
+    # the well-formedness of an f_structure is only checked with statistics to count its errors in.
+
+def validate(f_structure, stats):
+    validate_start = time.perf_counter()
+    errors = well_formedness_errors(f_structure)
+    stats.add_time('validate', time.perf_counter() - validate_start)
+    stats.well_formedness_checked(errors)
+
+    # the errors of an f_structure are counted by their type; the time to check it is part of its latency.
+
+def convert_block(block, ordinal, options=None, cache=None, stats=None):
+    if stats != None:
+        prefilter_start = time.perf_counter()
+
+    filtered_block, deprel, dropped_heads = prefilter_block(block)
+
+    if stats != None:
+        prefilter_end = time.perf_counter()
+        stats.add_time('prefilter', prefilter_end - prefilter_start)
+
+    if filtered_block == None:
+        if stats != None:
+            if deprel != None:
+                stats.reject('deprel {}'.format(deprel))
+
+            else:
+                stats.reject('no root')
+
+            stats.sentence_done(block_token_count(block), prefilter_end - prefilter_start, False)
+
+        return block_sent_id(block, ordinal), None
+
+    if options == None or 'compiled_feature_projection' not in options:
+        options = compile_options(options)
+
+    sentence = readers[options['reader']][0](filtered_block)[0]
+
+    if stats != None:
+        stats.add_time('parse', time.perf_counter() - prefilter_end)
+
+    return sentence_id(sentence, ordinal), convert_sentence(sentence, options, cache, stats, dropped_heads)
+
+    # convert_block() converts the raw text of a sentence, as cut from the file by read_sentence_blocks(), and returns its sent_id and f_structure.
+    # the sentence is prefiltered first and only parsed if it is not rejected; its f_structure is the same as if it had been parsed whole.
+
+def sentence_id(sentence, ordinal):
+    return sentence.metadata.get('sent_id', str(ordinal))
+
+    # sentences are identified by their sent_id, or by their position in the file (counting from 1) if they do not have one.
+
+def convert_stream(conllu_file, writer, options=None, cache=None, stats=None):
+    convert_blocks(enumerate(read_sentence_blocks(conllu_file, 1), 1), writer, options, cache, stats)
+
+    # the file is read one sentence at a time, so each sentence is prefiltered, parsed, filtered, composed and handed to the writer before the next is read.
+    # only one sentence is ever held in memory, however large the treebank is.
+
+def convert_blocks(numbered_blocks, writer, options=None, cache=None, stats=None):
+    options = compile_options(options)
+
+    if stats != None:
+        return convert_blocks_instrumented(numbered_blocks, writer, options, cache, stats)
+
+    for ordinal, block in numbered_blocks:
+        sent_id, f_structure = convert_block(block, ordinal, options, cache)
+
+        if f_structure == None:
+            writer.skip(sent_id)
+
+        else:
+            writer.write(sent_id, f_structure)
+
+    # convert_blocks() converts the raw blocks of sentences it is given with their positions in the file (counting from 1), one at a time,
+    # and writes them in the order they are given; convert_stream() gives it every sentence of a file and convert_subset() only some (see. conllu_index.py).
+
+def convert_blocks_instrumented(numbered_blocks, writer, options, cache, stats):
+    for ordinal, block in numbered_blocks:
+        sent_id, f_structure = convert_block(block, ordinal, options, cache, stats)
+        write_start = time.perf_counter()
+
+        if f_structure == None:
+            writer.skip(sent_id)
+
+        else:
+            record = encode_record(writer.output_format, sent_id, f_structure)
+            terms = None
+
+            if writer.query_index != None:
+                terms = query_terms(f_structure)
+
+            serialize_end = time.perf_counter()
+            stats.add_time('serialize', serialize_end - write_start)
+            writer.write_record(record, sent_id, terms)
+            write_start = serialize_end
+
+        stats.add_time('write', time.perf_counter() - write_start)
+
+    # convert_blocks_instrumented() is convert_blocks() with the time to serialize and write every sentence recorded in the statistics.
+    # the query terms of a sentence (see. query_terms() in f_structure_io.py) are counted as part of its serialization.
+
+def read_sentence_blocks(conllu_file, chunk_size):
+    chunk = []
+    block_lines = []
+
+    for line in conllu_file:
+        if line.strip() == '':
+            if len(block_lines) > 0:
+                block_lines.append('\n')
+                chunk.append(''.join(block_lines))
+                block_lines = []
+
+                if len(chunk) == chunk_size:
+                    yield ''.join(chunk)
+                    chunk = []
+
+        else:
+            block_lines.append(line)
+
+    if len(block_lines) > 0:
+        if block_lines[-1].endswith('\n') == False:
+            block_lines[-1] += '\n'
+
+        block_lines.append('\n')
+        chunk.append(''.join(block_lines))
+
+    if len(chunk) > 0:
+        yield ''.join(chunk)
+
+    # the raw text of the file is cut into chunks of chunk_size sentences without being parsed, so that parsing can also happen in the worker processes.
+    # every sentence ends with exactly one empty line, even the last sentence of a file which does not end with a newline, so that convert_chunk() can cut a chunk back into sentences.
+
+worker_cache = None
+
+def open_worker_cache(cache_path, cache_max_bytes):
+    global worker_cache
+
+    if cache_path != None:
+        worker_cache = ConversionCache(cache_path, cache_max_bytes)
+
+    # every process in the pool opens its own connection to the conversion cache.
+
+def convert_chunk(chunk, first_ordinal, options, output_format, collect_stats=False, collect_terms=False):
+    records = []
+    ordinal = first_ordinal
+    chunk_stats = None
+
+    if collect_stats == True:
+        chunk_stats = ConversionStats()
+        string_lookups, string_hits = string_pool.lookups, string_pool.hits
+
+    if worker_cache != None:
+        hits, misses = worker_cache.hits, worker_cache.misses
+
+    for block in chunk.split('\n\n')[:-1]:
+        sent_id, f_structure = convert_block(block, ordinal, options, worker_cache, chunk_stats)
+
+        if f_structure == None:
+            records.append((sent_id, None, None))
+
+        else:
+            serialize_start = time.perf_counter()
+            terms = None
+
+            if collect_terms == True:
+                terms = query_terms(f_structure)
+
+            records.append((sent_id, encode_record(output_format, sent_id, f_structure), terms))
+
+            if chunk_stats != None:
+                chunk_stats.add_time('serialize', time.perf_counter() - serialize_start)
+
+        ordinal += 1
+
+    if chunk_stats != None:
+        chunk_stats.record_string_pool(string_pool, string_lookups, string_hits)
+
+    if worker_cache != None:
+        worker_cache.commit()
+
+        return records, worker_cache.hits - hits, worker_cache.misses - misses, chunk_stats
+
+    return records, 0, 0, chunk_stats
+
+    # every sentence of a chunk ends with an empty line (see. read_sentence_blocks()), so the chunk is cut back into sentences at the empty lines.
+    # a chunk is converted exactly as convert_stream() converts a sentence, and returned as a list of sent_ids and records ready to be written, with their query terms if they were asked for,
+    # with the number of cache hits and misses it had and its statistics, with the string pool lookups of the chunk, if they were asked for. the record of a sentence which could not be converted is None.
+    # the cache is committed after every chunk, because the processes of a pool are stopped without warning when the pool is closed.
+
+def write_chunk(writer, converted_chunk, cache, stats):
+    records, hits, misses, chunk_stats = converted_chunk
+    write_start = time.perf_counter()
+
+    for sent_id, record, terms in records:
+        if record == None:
+            writer.skip(sent_id)
+
+        else:
+            writer.write_record(record, sent_id, terms)
+
+    if cache != None:
+        cache.hits += hits
+        cache.misses += misses
+
+    if stats != None:
+        chunk_stats.add_time('write', time.perf_counter() - write_start)
+        stats.merge(chunk_stats)
+
+    # the cache hits and misses and the statistics of the processes in the pool are added up in the main process.
+
+def convert_parallel(conllu_file, writer, options=None, processes=None, chunk_size=64, cache=None, stats=None):
+    if processes == None:
+        processes = os.cpu_count()
+
+    options = compile_options(options)
+    pending_chunks = deque()
+    first_ordinal = 1
+    cache_path = None
+    cache_max_bytes = None
+
+    if cache != None:
+        cache_path = cache.path
+        cache_max_bytes = cache.max_bytes
+
+    with Pool(processes, initializer=open_worker_cache, initargs=(cache_path, cache_max_bytes)) as pool:
+        for chunk in read_sentence_blocks(conllu_file, chunk_size):
+            pending_chunks.append(pool.apply_async(convert_chunk, (chunk, first_ordinal, options, writer.output_format, stats != None, writer.query_index != None)))
+            first_ordinal += chunk_size
+
+            if len(pending_chunks) >= processes * 2:
+                write_chunk(writer, pending_chunks.popleft().get(), cache, stats)
+
+        while len(pending_chunks) > 0:
+            write_chunk(writer, pending_chunks.popleft().get(), cache, stats)
+
+    # chunks are handed out to the pool as they are read, and their records are written strictly in the order the chunks were read,
+    # so the output is identical to convert_stream()'s. at most two chunks per process are in flight, which keeps memory flat.
+    # every chunk but the last has chunk_size sentences, so the position of the first sentence of each chunk is known without parsing.
+
+def run_worker(input_stream=sys.stdin, output_stream=sys.stdout, options=None, output_format='repr', cache=None, stats=None):
+    if output_format not in ['repr', 'jsonl']:
+        raise ValueError('the worker writes lines, so its output format must be repr or jsonl')
+
+    options = compile_options(options)
+    ordinal = 0
+
+    for sentence in readers[options['reader']][1](input_stream):
+        ordinal += 1
+
+        try:
+            f_structure = convert_sentence(sentence, options, cache, stats)
+
+        except Exception:
+            f_structure = None
+
+        output_stream.write(encode_record(output_format, sentence_id(sentence, ordinal), f_structure).decode('utf-8'))
+        output_stream.flush()
+
+    # the worker reads sentences as they arrive and answers each one with exactly one line, which is None if the sentence cannot be converted.
+    # a sentence which breaks the conversion is answered with None too, so that one bad sentence cannot take down a long-lived worker.
+    # the output is flushed after every sentence, so a client can send a sentence and wait for its f_structure without closing the stream.
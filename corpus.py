@@ -0,0 +1,106 @@
+import os
+import glob
+from multiprocessing import Pool
+from converter import *
+
+# a corpus conversion converts several CoNLL-U files, like the train, dev and test files of the HDT-UD, in one run.
+# the files are converted at the same time in one pool of processes, one file per process, so the size of the pool is a limit on the workers of the whole run.
+# every input gets an output of its own in the output directory, named after it, and the statistics of all the files are merged into one report.
+
+output_extensions = {'repr': '.txt', 'jsonl': '.jsonl', 'binary': '.bin'}
+
+def corpus_inputs(patterns):
+    inputs = []
+
+    for pattern in patterns:
+        paths = sorted(glob.glob(pattern))
+
+        if len(paths) == 0:
+            raise FileNotFoundError('no CoNLL-U files match {}'.format(pattern))
+
+        for path in paths:
+            if path not in inputs:
+                inputs.append(path)
+
+    return inputs
+
+    # every pattern is a path or a glob like 'de_hdt-ud-train-*.conllu'; the paths of a glob are taken in order, and a file matched twice is converted once.
+
+def corpus_output_path(input_path, output_directory, output_format, compress):
+    name = os.path.splitext(os.path.basename(input_path))[0] + output_extensions[output_format]
+
+    if compress == True:
+        name += '.gz'
+
+    return os.path.join(output_directory, name)
+
+    # de_hdt-ud-dev.conllu is written to de_hdt-ud-dev.txt in the repr format, de_hdt-ud-dev.jsonl in the jsonl format and so on.
+
+def convert_file(input_path, output_path, options, output_format, compress, index, query_index):
+    file_stats = ConversionStats()
+    string_lookups, string_hits = string_pool.lookups, string_pool.hits
+
+    if worker_cache != None:
+        hits, misses = worker_cache.hits, worker_cache.misses
+
+    with open(input_path, 'r') as conllu_file, FStructureWriter(output_path, output_format, compress, index=index, query_index=query_index) as writer:
+        convert_stream(conllu_file, writer, options, worker_cache, file_stats)
+
+    file_stats.record_string_pool(string_pool, string_lookups, string_hits)
+
+    if worker_cache != None:
+        worker_cache.commit()
+
+        return input_path, file_stats.summary(), file_stats, worker_cache.hits - hits, worker_cache.misses - misses
+
+    return input_path, file_stats.summary(), file_stats, 0, 0
+
+    # a file is converted by convert_stream() in one of the processes of the pool, and its summary is taken there, when the file is done,
+    # so that the time of every file is its own. the statistics themselves are sent back too, to be merged.
+
+def convert_corpus(patterns, output_directory, options=None, output_format='repr', compress=False, index=False, processes=None, cache=None, stats=None, query_index=False):
+    if processes == None:
+        processes = os.cpu_count()
+
+    options = compile_options(options)
+    inputs = corpus_inputs(patterns)
+    file_summaries = {}
+    cache_path = None
+    cache_max_bytes = None
+
+    if cache != None:
+        cache_path = cache.path
+        cache_max_bytes = cache.max_bytes
+
+    if stats == None:
+        stats = ConversionStats()
+
+    output_paths = [corpus_output_path(input_path, output_directory, output_format, compress) for input_path in inputs]
+
+    if len(set(output_paths)) != len(output_paths):
+        raise ValueError('two inputs of the corpus have the same name, so their outputs would overwrite each other')
+
+    os.makedirs(output_directory, exist_ok=True)
+
+    with Pool(min(processes, len(inputs)), initializer=open_worker_cache, initargs=(cache_path, cache_max_bytes)) as pool:
+        pending_files = [pool.apply_async(convert_file, (input_path, output_path, options, output_format, compress, index, query_index)) for input_path, output_path in zip(inputs, output_paths)]
+
+        for pending_file in pending_files:
+            input_path, file_summary, file_stats, hits, misses = pending_file.get()
+            file_summaries[input_path] = file_summary
+            stats.merge(file_stats)
+
+            if cache != None:
+                cache.hits += hits
+                cache.misses += misses
+
+    return {'files': file_summaries, 'total': stats.summary()}
+
+    # the report has the summary of every file (see. ConversionStats.summary()) and the summary of the whole corpus,
+    # whose throughput is that of the whole run and whose stage times are added up over the files.
+
+def corpus_report_lines(report):
+    for input_path, summary in report['files'].items():
+        yield '{}: {} sentences, {:.2f}% converted, {:.1f} sentences/s\n'.format(input_path, summary['sentences'], summary['success_rate'], summary['sentences_per_second'])
+
+    yield 'total: {} sentences in {} files, {:.2f}% converted, {:.1f} sentences/s\n'.format(report['total']['sentences'], len(report['files']), report['total']['success_rate'], report['total']['sentences_per_second'])
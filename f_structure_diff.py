@@ -0,0 +1,328 @@
+import os
+import sys
+import json
+import argparse
+from f_structure_io import *
+
+# a diff compares the f_structures of two outputs of the same CoNLL-U file, typically written before and after a change to the conversion rules,
+# and reports which sentences changed and under which GFs, rather than which lines of text differ.
+# the outputs are read one record at a time and paired by sent_id (see. pair_f_structures()), so any two outputs of any formats can be compared in bounded memory.
+# two f_structures are compared structurally (see. value_differences()): the order of the attributes of an AVM and of the members of a set does not matter.
+# every difference is counted under the GF it is found in, the innermost GF on its path, as added, removed or changed:
+#   ROOT/SUBJ/CASE changed     the CASE of the SUBJ changed, counted under SUBJ,
+#   ROOT/OBL:MIT removed       the OBL:MIT was removed as a whole, counted under OBL:MIT.
+
+def converted_entries(path):
+    with open(index_path(path), 'r', encoding='utf-8') as index_file:
+        for line in index_file:
+            sent_id, offset, length = line.rstrip('\n').split('\t')
+
+            if offset != '-1':
+                yield sent_id, int(offset), int(length)
+
+def check_sent_ids(path):
+    with open_output(path) as output_file:
+        output_format = detect_format(output_file)
+        empty = output_file.peek(1) == b''
+
+        if output_format != 'repr' or empty == True:
+            return
+
+        if os.path.exists(index_path(path)) == False:
+            raise ValueError('{} is in the repr format, which has no sent_ids, and has no index to read them from; write it with --index, or in the jsonl or binary format'.format(path))
+
+        entries = converted_entries(path)
+        position = 0
+
+        for line in output_file:
+            entry = next(entries, None)
+
+            if entry == None or entry[1:] != (position, len(line)):
+                raise ValueError('the index of {} does not match its records, so it was written for another output; write the output again with --index'.format(path))
+
+            position += len(line)
+
+        if next(entries, None) != None:
+            raise ValueError('the index of {} does not match its records, so it was written for another output; write the output again with --index'.format(path))
+
+    # an empty output, which has no records to pair, can be of any format.
+    # the records of a repr output cannot be paired by their positions instead, because the runs of two versions of the rules reject different sentences,
+    # so every record after the first sentence rejected by only one of them would be compared with the wrong sentence.
+    # every converted sentence in the index must be the record at its offset, so that an index left over from an earlier run cannot pair records with the wrong sent_ids;
+    # the lines of the output are only counted and measured, not parsed.
+
+def keyed_f_structures(path):
+    check_sent_ids(path)
+    entries = None
+
+    for sent_id, f_structure in read_f_structures(path):
+        if sent_id == None:
+            if entries == None:
+                entries = converted_entries(path)
+
+            entry = next(entries, None)
+
+            if entry == None:
+                raise ValueError('the index of {} lists fewer sentences than it has records'.format(path))
+
+            sent_id = entry[0]
+
+        yield sent_id, f_structure
+
+    # keyed_f_structures() yields the (sent_id, f_structure) pairs of an output like read_f_structures(), with a sent_id for the records of the repr format, which have none:
+    # they are read from the output's index, which lists the sentences in the order of their records (see. check_sent_ids()).
+
+def changed_gf(key, value, gf):
+    if type(value) == dict or type(value) == list:
+        return key
+
+    return gf
+
+    # a key whose value is an AVM or a set is a GF, and a key whose value is a string is an attribute of the GF it belongs to.
+
+def avm_differences(old_avm, new_avm, path, gf, differences):
+    for key, old_value in old_avm.items():
+        if key not in new_avm:
+            differences.append((changed_gf(key, old_value, gf), 'removed', path + key))
+
+        elif old_value != new_avm[key]:
+            value_differences(old_value, new_avm[key], path + key, changed_gf(key, old_value, gf), differences)
+
+    for key, new_value in new_avm.items():
+        if key not in old_avm:
+            differences.append((changed_gf(key, new_value, gf), 'added', path + key))
+
+def set_differences(old_set, new_set, path, gf, differences):
+    old_members = [member for member in old_set if member not in new_set]
+    new_members = [member for member in new_set if member not in old_set]
+
+    for old_member, new_member in zip(old_members, new_members):
+        value_differences(old_member, new_member, path, gf, differences)
+
+    for old_member in old_members[len(new_members):]:
+        differences.append((gf, 'removed', path))
+
+    for new_member in new_members[len(old_members):]:
+        differences.append((gf, 'added', path))
+
+    # the members found in both sets are left out, so an adjunct added at the front of a set is one added member, not a change to every member after it;
+    # the members left over are compared in pairs, in order, and those without a partner were added or removed.
+
+def value_differences(old_value, new_value, path, gf, differences):
+    if type(old_value) == dict and type(new_value) == dict:
+        avm_differences(old_value, new_value, path + '/', gf, differences)
+
+    elif type(old_value) == list and type(new_value) == list:
+        set_differences(old_value, new_value, path, gf, differences)
+
+    else:
+        differences.append((gf, 'changed', path))
+
+    # value_differences() adds the differences between two values which are not equal to a list, each a triple of a GF, the kind of difference and the path to it.
+    # values of different types, like an AVM which became a set of coordinated AVMs, are changed as a whole.
+
+def f_structure_differences(old_f_structure, new_f_structure):
+    differences = []
+
+    if old_f_structure != new_f_structure:
+        avm_differences(old_f_structure, new_f_structure, '', None, differences)
+
+    return differences
+
+    # equal f_structures are told apart by one comparison of the dictionaries, so only the f_structures which changed are walked.
+
+class FStructureDiff:
+    def __init__(self, max_examples=3):
+        self.max_examples = max_examples
+        self.compared = 0
+        self.changed = 0
+        self.only_first = 0
+        self.only_second = 0
+        self.gf_changes = {}
+        self.gf_sentences = {}
+        self.examples = {}
+        self.only_examples = {'first': [], 'second': []}
+
+        # the counts are kept per GF, and at most max_examples example sentences per GF, so the memory of a diff does not grow with the size of the outputs.
+
+    def compare(self, sent_id, old_f_structure, new_f_structure):
+        differences = f_structure_differences(old_f_structure, new_f_structure)
+        self.compared += 1
+
+        if len(differences) != 0:
+            self.changed += 1
+            changed_gfs = []
+
+            for gf, kind, path in differences:
+                gf_changes = self.gf_changes.setdefault(gf, {'added': 0, 'removed': 0, 'changed': 0})
+                gf_changes[kind] += 1
+
+                if gf not in changed_gfs:
+                    changed_gfs.append(gf)
+                    examples = self.examples.setdefault(gf, [])
+
+                    if len(examples) < self.max_examples:
+                        examples.append('{} {} {}'.format(sent_id, path, kind))
+
+            for gf in changed_gfs:
+                self.gf_sentences[gf] = self.gf_sentences.get(gf, 0) + 1
+
+        return differences
+
+        # compare() records the differences between the two f_structures of a sentence and returns them.
+        # every sentence is counted once under every GF it changed in, and is an example of the first difference it has under it.
+
+    def only_in(self, side, sent_id):
+        if side == 'first':
+            self.only_first += 1
+
+        else:
+            self.only_second += 1
+
+        if len(self.only_examples[side]) < self.max_examples:
+            self.only_examples[side].append(sent_id)
+
+        # a sentence which is only in one output was converted in one run and rejected in the other.
+
+    def summary(self):
+        gfs = sorted(self.gf_sentences, key=lambda gf: -self.gf_sentences[gf])
+
+        return {
+            'compared': self.compared,
+            'identical': self.compared - self.changed,
+            'changed': self.changed,
+            'only_in_first': self.only_first,
+            'only_in_second': self.only_second,
+            'gfs': {gf: dict(sentences=self.gf_sentences[gf], examples=self.examples[gf], **self.gf_changes[gf]) for gf in gfs},
+            'only_examples': self.only_examples
+        }
+
+    def report_lines(self):
+        yield '{} sentences compared: {} identical, {} changed, {} only in the first output, {} only in the second\n'.format(self.compared, self.compared - self.changed, self.changed, self.only_first, self.only_second)
+
+        for gf, gf_summary in self.summary()['gfs'].items():
+            yield '{}: {} sentences, {} added, {} removed, {} changed\n'.format(gf, gf_summary['sentences'], gf_summary['added'], gf_summary['removed'], gf_summary['changed'])
+
+            for example in gf_summary['examples']:
+                yield '    {}\n'.format(example)
+
+        for side in ['first', 'second']:
+            if len(self.only_examples[side]) != 0:
+                yield 'only in the {} output: {}\n'.format(side, ', '.join(self.only_examples[side]))
+
+def pair_f_structures(first_path, second_path, diff, window=10000):
+    streams = {'first': keyed_f_structures(first_path), 'second': keyed_f_structures(second_path)}
+    pending = {'first': {}, 'second': {}}
+    other_sides = {'first': 'second', 'second': 'first'}
+    side = 'second'
+
+    while len(streams) != 0:
+        if len(streams) == 1:
+            side = list(streams)[0]
+
+        elif len(pending['first']) != len(pending['second']):
+            side = min(pending, key=lambda pending_side: len(pending[pending_side]))
+
+        else:
+            side = other_sides[side]
+
+        record = next(streams[side], None)
+
+        if record == None:
+            del streams[side]
+
+            continue
+
+        sent_id, f_structure = record
+        other_side = other_sides[side]
+
+        if sent_id in pending[other_side]:
+            for pending_id in list(pending[other_side]):
+                if pending_id == sent_id:
+                    break
+
+                del pending[other_side][pending_id]
+                diff.only_in(other_side, pending_id)
+
+            for pending_id in pending[side]:
+                diff.only_in(side, pending_id)
+
+            pending[side].clear()
+            other_f_structure = pending[other_side].pop(sent_id)
+
+            if side == 'first':
+                yield sent_id, f_structure, other_f_structure
+
+            else:
+                yield sent_id, other_f_structure, f_structure
+
+        else:
+            pending[side][sent_id] = f_structure
+
+            if len(pending[side]) > window:
+                pending_id = next(iter(pending[side]))
+                del pending[side][pending_id]
+                diff.only_in(side, pending_id)
+
+    for pending_side in ['first', 'second']:
+        for pending_id in pending[pending_side]:
+            diff.only_in(pending_side, pending_id)
+
+    # pair_f_structures() yields the sent_id and the two f_structures of every sentence found in both outputs, and records the sentences found in only one in the diff.
+    # both outputs list their sentences in the order of the CoNLL-U file, each without the sentences its run rejected, so they are merged like two sorted lists:
+    # the sentences read from one output and not yet found in the other wait in a dictionary, and the output with fewer sentences waiting is read next.
+    # once a sentence is found in both, every sentence which waited on either side before it cannot be in the other output any more.
+    # so only the sentences between the last pair and the next are held in memory, and never more than window on either side;
+    # a sentence further than window sentences from its partner, in outputs which are not in the same order, is counted as only in one output instead.
+
+def diff_outputs(first_path, second_path, diff=None, window=10000):
+    if diff == None:
+        diff = FStructureDiff()
+
+    for sent_id, old_f_structure, new_f_structure in pair_f_structures(first_path, second_path, diff, window):
+        differences = diff.compare(sent_id, old_f_structure, new_f_structure)
+
+        if len(differences) != 0:
+            yield sent_id, differences
+
+    # diff_outputs() yields the sent_id and the differences of every sentence which changed between two outputs, and records every difference in the diff.
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='compare the f-structures of two outputs of the same CoNLL-U file, sentence by sentence.')
+    argument_parser.add_argument('first', help='the output of the first run, typically before a change to the conversion rules.')
+    argument_parser.add_argument('second', help='the output of the second run.')
+    argument_parser.add_argument('--examples', type=int, default=3, metavar='N', help='the number of example sentences to keep for every GF.')
+    argument_parser.add_argument('--window', type=int, default=10000, metavar='N', help='the number of sentences to hold from either output while looking for their partners in the other.')
+    argument_parser.add_argument('--list', action='store_true', help='print every difference of every sentence which changed.')
+    argument_parser.add_argument('--json', metavar='PATH', help='write the summary of the diff as JSON to PATH, or to stderr if PATH is -.')
+    arguments = argument_parser.parse_args()
+
+    for path in [arguments.first, arguments.second]:
+        try:
+            check_sent_ids(path)
+
+        except ValueError as error:
+            argument_parser.error(error.args[0])
+
+    diff = FStructureDiff(arguments.examples)
+
+    for sent_id, differences in diff_outputs(arguments.first, arguments.second, diff, arguments.window):
+        if arguments.list == True:
+            for gf, kind, path in differences:
+                print('{}\t{}\t{}\t{}'.format(sent_id, gf, kind, path))
+
+    for line in diff.report_lines():
+        sys.stderr.write(line)
+
+    if arguments.json != None:
+        summary = json.dumps(diff.summary(), indent=2, ensure_ascii=False)
+
+        if arguments.json == '-':
+            sys.stderr.write(summary + '\n')
+
+        else:
+            with open(arguments.json, 'w', encoding='utf-8') as summary_file:
+                summary_file.write(summary + '\n')
+
+    # python f_structure_diff.py before.txt after.txt prints how many sentences changed under every GF, with examples, and --list prints every difference,
+    # one per line as sent_id, GF, kind and path, so that the changed sentences can be filtered with grep or cut.
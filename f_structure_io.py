@@ -0,0 +1,399 @@
+import os
+import sys
+import ast
+import gzip
+import json
+import mmap
+import marshal
+import struct
+from array import array
+from f_structure_nodes import *
+
+# f_structures can be written in three formats:
+# 'repr' is the original format, one python representation of an f_structure per line, without the sent_id.
+# 'jsonl' is one JSON object per line of the form {"sent_id": ..., "f_structure": ...}.
+# 'binary' is a header followed by records which are each a four byte big-endian length and a marshalled (sent_id, f_structure) pair.
+# any of the formats can be gzipped.
+# an uncompressed output can have a sidecar index, the output's path with '.idx' appended, which maps every sent_id to the offset and length of its record.
+# an indexed output can also have a query index, the output's path with '.qidx' appended, which maps the GFs and attribute=value pairs in the f_structures
+# to the sentences they appear in (see. query_terms() and f_structure_query.py).
+
+output_formats = ['repr', 'jsonl', 'binary']
+
+binary_header = b'LFGB\x01'
+record_length = struct.Struct('>I')
+
+def canonical_copy(value, strings, copies):
+    if type(value) == str:
+        return strings.setdefault(value, sys.intern(value))
+
+    elif type(value) == FrozenAVM:
+        return {canonical_copy(key, strings, copies): canonical_copy(sub_value, strings, copies) for key, sub_value in value.items()}
+
+    elif type(value) in container_types:
+        if id(value) in copies:
+            return copies[id(value)]
+
+        if type(value) == list or type(value) == FSet:
+            copy = []
+            copies[id(value)] = copy
+            copy.extend([canonical_copy(sub_value, strings, copies) for sub_value in value])
+
+        else:
+            copy = {}
+            copies[id(value)] = copy
+
+            for key, sub_value in value.items():
+                copy[canonical_copy(key, strings, copies)] = canonical_copy(sub_value, strings, copies)
+
+        return copy
+
+    return value
+
+    # marshal only writes a repeated object once, as a reference, if something else refers to it, which depends on where the object came from.
+    # a copy in which every dictionary and list is new and every equal string is one interned object held by the strings dictionary
+    # is written the same way wherever the f_structure came from, and each repeated string is written only once.
+    # the copy is also plain: the nodes of a composed f_structure (see. f_structure_nodes.py) become plain dictionaries and lists, which marshal can write.
+    # a node which appears in more than one place is copied once, so that marshal writes it once and the f_structure read back shares it too,
+    # except for a hash-consed AVM, which is only shared for storage (see. shared_nodes()) and is copied in every place it appears;
+    # the copies dictionary must be emptied before the copy is marshalled, so that only the shared copies have more than one reference.
+
+def encode_record(output_format, sent_id, f_structure):
+    if output_format == 'repr':
+        return (str(f_structure) + '\n').encode('utf-8')
+
+    elif output_format == 'jsonl':
+        shared = shared_nodes(f_structure)
+
+        if len(shared) != 0:
+            f_structure = referenced_f_structure(f_structure, shared, {})
+
+        return (json.dumps({'sent_id': sent_id, 'f_structure': f_structure}, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+    elif output_format == 'binary':
+        strings = {}
+        copies = {}
+        record_value = (canonical_copy(sent_id, strings, copies), canonical_copy(f_structure, strings, copies))
+        copies.clear()
+        record = marshal.dumps(record_value, 4)
+
+        return record_length.pack(len(record)) + record
+
+    raise ValueError('unknown output format: {}'.format(output_format))
+
+    # records are encoded to bytes on their own, so that they can be encoded in worker processes and written by the main process.
+    # shared structure (see. f_structure_nodes.py) is kept by the binary format, and by the jsonl format as '@id' and '@ref' references;
+    # the repr format cannot express it, so a shared node is printed in full in every place it appears.
+
+def decode_record(output_format, record):
+    if output_format == 'repr':
+        return None, ast.literal_eval(record.decode('utf-8'))
+
+    elif output_format == 'jsonl':
+        json_record = json.loads(record)
+
+        if b'"@id":' in record:
+            return json_record['sent_id'], resolve_references(json_record['f_structure'])
+
+        return json_record['sent_id'], json_record['f_structure']
+
+    elif output_format == 'binary':
+        return marshal.loads(record[record_length.size:])
+
+    raise ValueError('unknown output format: {}'.format(output_format))
+
+    # decode_record() takes a whole record as written by encode_record() and returns its sent_id (None for the repr format) and f_structure.
+
+def query_terms(f_structure):
+    terms = set()
+    seen = set()
+    stack = [f_structure]
+
+    while len(stack) != 0:
+        value = stack.pop()
+
+        if id(value) in seen:
+            continue
+
+        seen.add(id(value))
+
+        if type(value) == list or type(value) == FSet:
+            stack.extend(value)
+
+            continue
+
+        for key, sub_value in value.items():
+            terms.add(key)
+
+            if type(sub_value) == str:
+                terms.add('{}={}'.format(key, sub_value))
+
+            elif type(sub_value) in container_types:
+                stack.append(sub_value)
+                members = sub_value
+
+                if type(sub_value) != list and type(sub_value) != FSet:
+                    members = [sub_value]
+
+                for member in members:
+                    for member_key, member_value in member.items():
+                        terms.add('{}/{}'.format(key, member_key))
+
+                        if type(member_value) == str:
+                            terms.add('{}/{}={}'.format(key, member_key, member_value))
+
+    return terms
+
+    # query_terms() returns the terms an f_structure is listed under in the query index: every GF or attribute ('SUBJ'), every attribute=value pair ('CASE=NOM'),
+    # and every GF or attribute=value pair one level below a GF, prefixed with it ('SUBJ/CASE', 'SUBJ/CASE=NOM'). a GF whose value is a set has the terms of every member.
+    # a shared node is walked once, but listed under every GF it is the value of.
+
+def query_index_path(path):
+    return path + '.qidx'
+
+class QueryIndexBuilder:
+    def __init__(self):
+        self.sent_ids = []
+        self.postings = {}
+
+    def add(self, sent_id, terms):
+        position = len(self.sent_ids)
+        self.sent_ids.append(sent_id)
+
+        for term in terms:
+            posting = self.postings.get(term)
+
+            if posting == None:
+                posting = array('I')
+                self.postings[term] = posting
+
+            posting.append(position)
+
+        # the sentences are numbered in the order they are added, so every posting list is sorted without sorting it.
+
+    def write(self, path):
+        with open(query_index_path(path), 'wb') as query_index_file:
+            marshal.dump((self.sent_ids, {term: self.postings[term].tobytes() for term in sorted(self.postings)}), query_index_file, 2)
+
+    # the postings of a term are the numbers of the sentences it appears in, kept as an array of four byte integers, which is written as it is.
+    # the terms are written in order, and with version 2 of marshal, which has no references, so that the same f_structures always give the same query index.
+
+class FStructureWriter:
+    def __init__(self, path, output_format='repr', compress=False, buffer_size=1048576, index=False, query_index=False):
+        if output_format not in output_formats:
+            raise ValueError('unknown output format: {}'.format(output_format))
+
+        if compress == True and index == True:
+            raise ValueError('a gzipped output cannot be indexed, because its records cannot be read without decompressing everything before them')
+
+        self.path = path
+        self.output_format = output_format
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.buffered_bytes = 0
+        self.position = 0
+
+        self.index_file = None
+        self.query_index = None
+
+        if compress == True:
+            self.file = gzip.open(path, 'wb', compresslevel=6)
+
+        else:
+            self.file = open(path, 'wb')
+
+        if index == True:
+            self.index_file = open(index_path(path), 'w', encoding='utf-8', buffering=buffer_size)
+
+        elif os.path.exists(index_path(path)) == True:
+            os.remove(index_path(path))
+
+        if query_index == True:
+            if index == False:
+                raise ValueError('a query index is answered from the records of an output, so the output must be indexed too')
+
+            self.query_index = QueryIndexBuilder()
+
+        elif os.path.exists(query_index_path(path)) == True:
+            os.remove(query_index_path(path))
+
+        # an index or query index left over from an earlier output at the same path would describe records which are no longer there, so it is removed.
+
+        if output_format == 'binary':
+            self.write_record(binary_header)
+
+        # the position counts the bytes of uncompressed output written so far, so that the offset of every record is known.
+
+    def write_record(self, record, sent_id=None, terms=None):
+        offset = self.position
+        self.buffer.append(record)
+        self.buffered_bytes += len(record)
+        self.position += len(record)
+
+        if self.buffered_bytes >= self.buffer_size:
+            self.flush()
+
+        if sent_id != None and self.index_file != None:
+            self.index_file.write('{}\t{}\t{}\n'.format(sent_id, offset, len(record)))
+
+        if terms != None and self.query_index != None:
+            self.query_index.add(sent_id, terms)
+
+        return offset, len(record)
+
+        # records are collected in a buffer and written together once it is full, rather than with a write for every record.
+        # the query terms of a record (see. query_terms()) are added to the query index, if there is one.
+
+    def write(self, sent_id, f_structure):
+        terms = None
+
+        if self.query_index != None:
+            terms = query_terms(f_structure)
+
+        return self.write_record(encode_record(self.output_format, sent_id, f_structure), sent_id, terms)
+
+    def skip(self, sent_id):
+        if self.index_file != None:
+            self.index_file.write('{}\t-1\t0\n'.format(sent_id))
+
+        # sentences which could not be converted have no record, but they are listed in the index with the offset -1.
+
+    def flush(self):
+        if len(self.buffer) != 0:
+            self.file.write(b''.join(self.buffer))
+            self.buffer = []
+            self.buffered_bytes = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+        if self.index_file != None:
+            self.index_file.close()
+
+        if self.query_index != None:
+            self.query_index.write(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
+
+def index_path(path):
+    return path + '.idx'
+
+def open_output(path):
+    with open(path, 'rb') as output_file:
+        magic = output_file.read(2)
+
+    if magic == b'\x1f\x8b':
+        return gzip.open(path, 'rb')
+
+    return open(path, 'rb')
+
+def detect_format(output_file):
+    start = output_file.peek(len(binary_header))[:len(binary_header)]
+
+    if start == binary_header:
+        return 'binary'
+
+    elif start[:2] == b'{"':
+        return 'jsonl'
+
+    return 'repr'
+
+    # the format of an output is recognised by its first bytes: the binary header, a JSON object or a python dictionary.
+
+def read_f_structures(path):
+    with open_output(path) as output_file:
+        output_format = detect_format(output_file)
+
+        if output_format == 'binary':
+            output_file.read(len(binary_header))
+
+            while True:
+                length_bytes = output_file.read(record_length.size)
+
+                if len(length_bytes) < record_length.size:
+                    break
+
+                yield marshal.loads(output_file.read(record_length.unpack(length_bytes)[0]))
+
+        else:
+            for line in output_file:
+                yield decode_record(output_format, line)
+
+    # read_f_structures() yields the (sent_id, f_structure) pairs of an output of any format one at a time.
+
+class IndexedFStructures:
+    def __init__(self, path):
+        self.offsets = {}
+        self.sent_ids = []
+
+        with open(index_path(path), 'r', encoding='utf-8') as index_file:
+            for line in index_file:
+                sent_id, offset, length = line.rstrip('\n').split('\t')
+                self.offsets[sent_id] = (int(offset), int(length))
+                self.sent_ids.append(sent_id)
+
+        self.file = open(path, 'rb')
+        self.mapped_file = None
+
+        if os.fstat(self.file.fileno()).st_size > 0:
+            self.mapped_file = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            if self.mapped_file[:2] == b'\x1f\x8b':
+                self.close()
+
+                raise ValueError('{} is gzipped and cannot be read by offset'.format(path))
+
+        self.output_format = 'repr'
+
+        if self.mapped_file != None:
+            if self.mapped_file[:len(binary_header)] == binary_header:
+                self.output_format = 'binary'
+
+            elif self.mapped_file[:2] == b'{"':
+                self.output_format = 'jsonl'
+
+        # the index is read into a dictionary and the output is memory-mapped, so no record is read until it is asked for.
+
+    def get(self, sent_id):
+        offset, length = self.offsets[sent_id]
+
+        if offset == -1:
+            return None
+
+        return decode_record(self.output_format, self.mapped_file[offset:offset + length])[1]
+
+        # get() returns the f_structure of a sentence, or None if the sentence could not be converted, by decoding only its own record.
+        # it raises a KeyError for a sent_id which is not in the index.
+
+    def __getitem__(self, sent_id):
+        return self.get(sent_id)
+
+    def __contains__(self, sent_id):
+        return sent_id in self.offsets
+
+    def __len__(self):
+        return len(self.sent_ids)
+
+    def close(self):
+        if self.mapped_file != None:
+            self.mapped_file.close()
+
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
+
+if __name__ == '__main__':
+    with IndexedFStructures(sys.argv[1]) as f_structures:
+        for sent_id in sys.argv[2:]:
+            print(sent_id, f_structures.get(sent_id))
+
+    # python f_structure_io.py output.txt sent_id ... prints the f_structures of the given sentences from an indexed output.
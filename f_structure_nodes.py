@@ -0,0 +1,186 @@
+# f_structures are built from two types of node: attribute-value matrices, which are dictionaries of GFs and their values,
+# and sets, which are lists of attribute-value matrices, like the values of ADJ functions and coordinated conjuncts.
+# every node has an .avm() method which returns the attribute-value matrix that GFs are nested in: an AVM is its own, and a set's is its first member,
+# which is the AVM of the token the set belongs to. this lets f_compose() and pred_format() nest a GF in any value without checking its type.
+
+class AVM(dict):
+    __slots__ = ()
+
+    def avm(self):
+        return self
+
+class FSet(list):
+    __slots__ = ()
+
+    def avm(self):
+        return self[0]
+
+class FrozenAVM(dict):
+    __slots__ = ()
+
+    def avm(self):
+        return self
+
+    def frozen(self, *arguments):
+        raise TypeError('a hash-consed AVM is shared between f_structures and cannot be changed')
+
+    __setitem__ = __delitem__ = update = setdefault = pop = popitem = clear = frozen
+
+    def __reduce__(self):
+        return FrozenAVM, (dict(self),)
+
+    # a frozen AVM is a leaf AVM which has been hash-consed (see. hash_cons()), and may be shared by any number of f_structures.
+    # it cannot be changed, because a change would show in every f_structure which shares it.
+
+container_types = (dict, list, AVM, FSet, FrozenAVM)
+
+# the types of node which can hold other values; a plain f_structure is made of dictionaries and lists, and a composed one of the node types.
+
+def plain_f_structure(value, copies=None):
+    if copies == None:
+        copies = {}
+
+    if type(value) == FrozenAVM:
+        return dict(value)
+
+    elif type(value) in container_types:
+        if id(value) in copies:
+            return copies[id(value)]
+
+        if type(value) == list or type(value) == FSet:
+            copy = []
+            copies[id(value)] = copy
+            copy.extend([plain_f_structure(sub_value, copies) for sub_value in value])
+
+        else:
+            copy = {}
+            copies[id(value)] = copy
+
+            for key, sub_value in value.items():
+                copy[key] = plain_f_structure(sub_value, copies)
+
+        return copy
+
+    return value
+
+    # plain_f_structure() copies a composed f_structure into plain dictionaries and lists, which is what the marshal module needs.
+    # a node which appears in more than one place in the f_structure is copied once, so the copy shares its structure just as the f_structure does,
+    # and marshal writes a shared node once and refers back to it.
+    # a plain copy prints and is written as JSON exactly as the nodes are, so the other output formats write the nodes as they are.
+    # a hash-consed AVM (see. hash_cons()) is only shared for storage, like in shared_nodes(), so every place it appears in gets a copy of its own.
+
+def shared_nodes(f_structure):
+    seen = set()
+    shared = set()
+    stack = [f_structure]
+
+    while len(stack) != 0:
+        value = stack.pop()
+
+        if type(value) in container_types and type(value) != FrozenAVM:
+            if id(value) in seen:
+                shared.add(id(value))
+
+                continue
+
+            seen.add(id(value))
+
+            if type(value) == list or type(value) == FSet:
+                stack.extend(value)
+
+            else:
+                stack.extend(value.values())
+
+    return shared
+
+    # shared_nodes() returns the ids of the nodes which appear in more than one place in an f_structure, like the subject of an open complement.
+    # hash-consed AVMs are shared with other f_structures for storage only, so they are not counted.
+
+def referenced_f_structure(value, shared, reference_ids):
+    if type(value) in container_types and id(value) in shared:
+        if id(value) in reference_ids:
+            return {'@ref': reference_ids[id(value)]}
+
+        reference_ids[id(value)] = len(reference_ids) + 1
+
+        if type(value) == list or type(value) == FSet:
+            return {'@id': reference_ids[id(value)], '@set': [referenced_f_structure(sub_value, shared, reference_ids) for sub_value in value]}
+
+        copy = {'@id': reference_ids[id(value)]}
+
+    elif type(value) == list or type(value) == FSet:
+        return [referenced_f_structure(sub_value, shared, reference_ids) for sub_value in value]
+
+    elif type(value) in container_types:
+        copy = {}
+
+    else:
+        return value
+
+    for key, sub_value in value.items():
+        copy[key] = referenced_f_structure(sub_value, shared, reference_ids)
+
+    return copy
+
+    # referenced_f_structure() copies an f_structure for JSON, which cannot share structure: the first time a shared node is written it is given an '@id',
+    # and every later time it is written as {'@ref': id}. a shared set is written as {'@id': id, '@set': [...]}.
+
+def resolve_references(value, nodes=None):
+    if nodes == None:
+        nodes = {}
+
+    if type(value) == list:
+        for position in range(len(value)):
+            value[position] = resolve_references(value[position], nodes)
+
+        return value
+
+    elif type(value) == dict:
+        if '@ref' in value:
+            return nodes[value['@ref']]
+
+        if '@set' in value:
+            resolved_set = []
+            nodes[value['@id']] = resolved_set
+            resolved_set.extend([resolve_references(sub_value, nodes) for sub_value in value['@set']])
+
+            return resolved_set
+
+        if '@id' in value:
+            nodes[value.pop('@id')] = value
+
+        for key in value:
+            value[key] = resolve_references(value[key], nodes)
+
+    return value
+
+    # resolve_references() turns the references written by referenced_f_structure() back into shared nodes, in place.
+
+def hash_cons(value, pool, shared):
+    if type(value) == AVM or type(value) == dict:
+        leaf = True
+
+        for key, sub_value in value.items():
+            if type(sub_value) in container_types:
+                value[key] = hash_cons(sub_value, pool, shared)
+                leaf = False
+
+        if leaf == True and id(value) not in shared:
+            leaf_key = tuple(value.items())
+
+            if leaf_key not in pool:
+                pool[leaf_key] = FrozenAVM(value)
+
+            return pool[leaf_key]
+
+    elif type(value) == FSet or type(value) == list:
+        for position in range(len(value)):
+            value[position] = hash_cons(value[position], pool, shared)
+
+    return value
+
+    # hash_cons() replaces every leaf AVM of an f_structure, an AVM whose values are all atomic like {'BOOL': '+'} or {'PRED': 'NOM'},
+    # with the one frozen AVM in the pool with the same attributes and values, so identical leaves across a whole corpus are kept in memory once.
+    # leaves which are shared within the f_structure (see. shared_nodes()) are left as they are, so that they stay reentrant.
+    # the attributes are compared in order, so a hash-consed f_structure prints exactly as it did before.
+    # a plain f_structure, like one read from the conversion cache, is hash-consed the same way as a composed one.
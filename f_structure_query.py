@@ -0,0 +1,274 @@
+import sys
+import time
+import bisect
+import marshal
+import argparse
+from f_structure_io import *
+
+# queries find the sentences whose f_structures contain an AVM which satisfies every one of a list of constraints, written in square brackets:
+#   [SUBJ[CASE=NOM], OBL:MIT]   an AVM with a SUBJ whose CASE is NOM and with an OBL:MIT,
+#   [PRED=lesen<(SUBJ)(OBJ)>]   an AVM whose PRED is exactly lesen<(SUBJ)(OBJ)>,
+#   [XCOMP[OBJ[DEF[BOOL=-]]]]   constraints nested to any depth.
+# a constraint is a GF or attribute, which must be present, an attribute=value pair, or a GF followed by the constraints on its value.
+# a GF whose value is a set satisfies its constraints if any member of the set does.
+# a query is answered from the query index written with the output (see. query_terms() and QueryIndexBuilder in f_structure_io.py):
+# the posting lists of the terms every matching sentence must have are intersected, and only the f_structures of the sentences left are read and checked.
+
+def parse_constraints(query, position):
+    constraints = []
+
+    if position >= len(query) or query[position] != '[':
+        raise ValueError('expected [ at position {} of {}'.format(position, query))
+
+    position += 1
+
+    while True:
+        name_start = position
+
+        while position < len(query) and query[position] not in '[],=':
+            position += 1
+
+        name = query[name_start:position].strip()
+
+        if name == '':
+            raise ValueError('expected a GF or attribute at position {} of {}'.format(name_start, query))
+
+        if position < len(query) and query[position] == '=':
+            value_start = position + 1
+            position = value_start
+
+            while position < len(query) and query[position] not in '[],':
+                position += 1
+
+            constraints.append(('attribute', name, query[value_start:position].strip()))
+
+        elif position < len(query) and query[position] == '[':
+            sub_constraints, position = parse_constraints(query, position)
+            constraints.append(('gf', name, sub_constraints))
+
+        else:
+            constraints.append(('gf', name, None))
+
+        while position < len(query) and query[position] == ' ':
+            position += 1
+
+        if position >= len(query):
+            raise ValueError('expected ] at the end of {}'.format(query))
+
+        elif query[position] == ']':
+            return constraints, position + 1
+
+        elif query[position] != ',':
+            raise ValueError('expected , or ] at position {} of {}'.format(position, query))
+
+        position += 1
+
+    # parse_constraints() parses a list of constraints in square brackets starting at position, and returns them with the position after the closing bracket.
+    # every constraint is a triple: ('gf', GF, constraints on its value or None) or ('attribute', attribute, value).
+
+def parse_query(query):
+    query = query.strip()
+    constraints, position = parse_constraints(query, 0)
+
+    if position != len(query):
+        raise ValueError('unexpected {} after the end of {}'.format(query[position:], query))
+
+    return constraints
+
+def constraint_terms(constraints, gf=None):
+    terms = []
+
+    for kind, name, target in constraints:
+        if kind == 'attribute':
+            term = '{}={}'.format(name, target)
+
+        else:
+            term = name
+
+        if gf != None:
+            term = '{}/{}'.format(gf, term)
+
+        terms.append(term)
+
+        if kind == 'gf' and target != None:
+            terms.extend(constraint_terms(target, name))
+
+    return terms
+
+    # constraint_terms() returns the terms every f_structure which satisfies the constraints is listed under (see. query_terms() in f_structure_io.py).
+    # the terms only record a GF's parent, not the whole path to it, so an f_structure with all of them is a candidate which still has to be checked.
+
+def avm_matches(avm, constraints):
+    for kind, name, target in constraints:
+        if name not in avm:
+            return False
+
+        value = avm[name]
+
+        if kind == 'attribute':
+            if value != target:
+                return False
+
+        elif target != None:
+            members = value
+
+            if type(value) != list:
+                members = [value]
+
+            matched = False
+
+            for member in members:
+                if type(member) == dict and avm_matches(member, target) == True:
+                    matched = True
+
+                    break
+
+            if matched == False:
+                return False
+
+    return True
+
+def f_structure_matches(f_structure, constraints):
+    seen = set()
+    stack = [f_structure]
+
+    while len(stack) != 0:
+        value = stack.pop()
+
+        if id(value) in seen:
+            continue
+
+        seen.add(id(value))
+
+        if type(value) == list:
+            stack.extend(value)
+
+        elif type(value) == dict:
+            if avm_matches(value, constraints) == True:
+                return True
+
+            for sub_value in value.values():
+                if type(sub_value) == list or type(sub_value) == dict:
+                    stack.append(sub_value)
+
+    return False
+
+    # f_structure_matches() checks whether any AVM of an f_structure, at any depth, satisfies the constraints.
+    # f_structures read back from an output are plain dictionaries and lists.
+
+class FStructureQuery:
+    def __init__(self, path):
+        with open(query_index_path(path), 'rb') as query_index_file:
+            self.sent_ids, self.postings = marshal.load(query_index_file)
+
+        self.f_structures = IndexedFStructures(path)
+
+        # the posting lists are kept as the bytes they were written as, and only read as arrays of integers when a query needs them.
+
+    def posting(self, term):
+        return memoryview(self.postings.get(term, b'')).cast('I')
+
+    def candidates(self, constraints):
+        postings = sorted([self.posting(term) for term in set(constraint_terms(constraints))], key=len)
+        positions = list(postings[0])
+
+        for posting in postings[1:]:
+            kept_positions = []
+
+            for position in positions:
+                found = bisect.bisect_left(posting, position)
+
+                if found < len(posting) and posting[found] == position:
+                    kept_positions.append(position)
+
+            positions = kept_positions
+
+        return positions
+
+        # the posting lists are intersected from the shortest up: every position left is looked up in the next list by bisection,
+        # so the cost of a query depends on its rarest term rather than on the size of the corpus.
+
+    def query(self, query):
+        constraints = parse_query(query)
+        matches = []
+
+        for position in self.candidates(constraints):
+            sent_id = self.sent_ids[position]
+
+            if f_structure_matches(self.f_structures.get(sent_id), constraints) == True:
+                matches.append(sent_id)
+
+        return matches
+
+        # query() returns the sent_ids of the sentences which match a query, in the order of the output.
+
+    def close(self):
+        self.f_structures.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
+
+def build_query_index(path):
+    builder = QueryIndexBuilder()
+
+    with IndexedFStructures(path) as f_structures:
+        for sent_id in f_structures.sent_ids:
+            f_structure = f_structures.get(sent_id)
+
+            if f_structure != None:
+                builder.add(sent_id, query_terms(f_structure))
+
+    builder.write(path)
+
+    # build_query_index() writes the query index of an indexed output which was written without one.
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='query the f-structures of an output written with --query-index.')
+    argument_parser.add_argument('output')
+    argument_parser.add_argument('queries', nargs='*', metavar='QUERY', help='queries like "[SUBJ[CASE=NOM], OBL:MIT]"; read one per line from stdin if left out.')
+    argument_parser.add_argument('--count', action='store_true', help='print only the number of matches of every query.')
+    argument_parser.add_argument('--print', action='store_true', help='print the f-structure of every match after its sent_id.')
+    argument_parser.add_argument('--build', action='store_true', help='build the query index of an indexed output written without one, then answer the queries.')
+    arguments = argument_parser.parse_intermixed_args()
+
+    if arguments.build == True:
+        build_query_index(arguments.output)
+
+    queries = arguments.queries
+
+    if len(queries) == 0 and arguments.build == False:
+        queries = sys.stdin
+
+    with FStructureQuery(arguments.output) as f_structure_query:
+        for query in queries:
+            if query.strip() == '':
+                continue
+
+            query_start = time.perf_counter()
+
+            try:
+                matches = f_structure_query.query(query)
+
+            except ValueError as error:
+                sys.stderr.write('{}\n'.format(error))
+
+                continue
+
+            if arguments.count == True:
+                print(len(matches))
+
+            else:
+                for sent_id in matches:
+                    if arguments.print == True:
+                        print(sent_id, f_structure_query.f_structures.get(sent_id))
+
+                    else:
+                        print(sent_id)
+
+            sys.stderr.write('{}: {} matches in {:.1f} ms\n'.format(query.strip(), len(matches), (time.perf_counter() - query_start) * 1000))
+
+    # python f_structure_query.py output.txt "[SUBJ[CASE=NOM], OBL:MIT]" prints the sent_ids of the matching sentences, and reads queries from stdin if none are given,
+    # so that one index can answer a whole session of queries.
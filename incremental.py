@@ -0,0 +1,145 @@
+import os
+import hashlib
+from converter import *
+from conversion_cache import options_fingerprint
+
+# an incremental conversion keeps a manifest next to its output, the output's path with '.manifest' appended.
+# the manifest lists every sentence of the input with a hash of its block of CoNLL-U text and the offset and length of its record in the output.
+# on the next run, only sentences which were added or whose text changed are converted again; the records of unchanged sentences are copied
+# from the old output, and sentences which were deleted from the input are left out.
+
+def manifest_path(path):
+    return path + '.manifest'
+
+def run_fingerprint(options, output_format):
+    return hashlib.sha1('{}\t{}\t{}\t{}'.format(options_fingerprint(options), output_format, options['orphans'], options['max_tokens']).encode('utf-8')).hexdigest()
+
+    # the options which decide whether a sentence is converted at all are part of the fingerprint, as well as those which change its f_structure.
+
+def output_signature(path):
+    output_stat = os.stat(path)
+
+    return '# output = size {} mtime {}'.format(output_stat.st_size, output_stat.st_mtime_ns)
+
+def read_manifest(path, fingerprint):
+    manifest = {}
+    signature = None
+
+    if os.path.exists(manifest_path(path)) == False or os.path.exists(path) == False:
+        return manifest
+
+    with open(manifest_path(path), 'r', encoding='utf-8') as manifest_file:
+        if manifest_file.readline().rstrip('\n') != '# fingerprint = {}'.format(fingerprint):
+            return manifest
+
+        for line in manifest_file:
+            if line.startswith('# output = '):
+                signature = line.rstrip('\n')
+
+                continue
+
+            sent_id, content_hash, offset, length = line.rstrip('\n').split('\t')
+            manifest[sent_id] = (content_hash, int(offset), int(length))
+
+    if signature != output_signature(path):
+        return {}
+
+    return manifest
+
+    # a manifest written with different options or in a different output format is ignored, so that every sentence is converted again.
+    # so is a manifest whose output has been written since, by a run which was not incremental for example: the manifest ends with the size and modification time
+    # of the output it describes, and the offsets in it only hold for that output. a manifest without them, from an interrupted run, is ignored too.
+
+def convert_incremental(conllu_path, output_path, options=None, output_format='repr', index=False, cache=None, stats=None, query_index=False):
+    options = compile_options(options)
+    fingerprint = run_fingerprint(options, output_format)
+    old_manifest = read_manifest(output_path, fingerprint)
+    counts = {'unchanged': 0, 'added': 0, 'changed': 0, 'deleted': 0}
+    seen_sent_ids = set()
+    ordinal = 0
+
+    new_output_path = output_path + '.incremental'
+    old_output = None
+
+    if len(old_manifest) != 0:
+        old_output = open(output_path, 'rb')
+
+    with open(conllu_path, 'r') as conllu_file, FStructureWriter(new_output_path, output_format, index=index, query_index=query_index) as writer, open(manifest_path(new_output_path), 'w', encoding='utf-8') as manifest_file:
+        manifest_file.write('# fingerprint = {}\n'.format(fingerprint))
+
+        for block in read_sentence_blocks(conllu_file, 1):
+            ordinal += 1
+            sent_id = block_sent_id(block, ordinal)
+            content_hash = hashlib.sha1(block.encode('utf-8')).hexdigest()
+            seen_sent_ids.add(sent_id)
+
+            if sent_id in old_manifest and old_manifest[sent_id][0] == content_hash:
+                old_offset, old_length = old_manifest[sent_id][1:]
+                counts['unchanged'] += 1
+
+                if old_offset == -1:
+                    writer.skip(sent_id)
+                    offset, length = -1, 0
+
+                else:
+                    old_output.seek(old_offset)
+                    record = old_output.read(old_length)
+                    terms = None
+
+                    if query_index == True:
+                        terms = query_terms(decode_record(output_format, record)[1])
+
+                    offset, length = writer.write_record(record, sent_id, terms)
+
+                # the record of an unchanged sentence is copied from the old output without the sentence being parsed.
+                # with a query index, the record is decoded for its query terms, which is still much less work than converting the sentence again.
+
+            else:
+                if sent_id in old_manifest:
+                    counts['changed'] += 1
+
+                else:
+                    counts['added'] += 1
+
+                f_structure = convert_block(block, ordinal, options, cache, stats)[1]
+
+                if f_structure == None:
+                    writer.skip(sent_id)
+                    offset, length = -1, 0
+
+                else:
+                    offset, length = writer.write(sent_id, f_structure)
+
+            manifest_file.write('{}\t{}\t{}\t{}\n'.format(sent_id, content_hash, offset, length))
+
+    if old_output != None:
+        old_output.close()
+
+    with open(manifest_path(new_output_path), 'a', encoding='utf-8') as manifest_file:
+        manifest_file.write(output_signature(new_output_path) + '\n')
+
+    # the signature of the output is added once the output is complete; moving the output into place below keeps its size and modification time.
+
+    for sent_id in old_manifest:
+        if sent_id not in seen_sent_ids:
+            counts['deleted'] += 1
+
+    os.replace(new_output_path, output_path)
+    os.replace(manifest_path(new_output_path), manifest_path(output_path))
+
+    if index == True:
+        os.replace(index_path(new_output_path), index_path(output_path))
+
+    elif os.path.exists(index_path(output_path)) == True:
+        os.remove(index_path(output_path))
+
+    if query_index == True:
+        os.replace(query_index_path(new_output_path), query_index_path(output_path))
+
+    elif os.path.exists(query_index_path(output_path)) == True:
+        os.remove(query_index_path(output_path))
+
+    return counts
+
+    # the new output and manifest are written next to the old ones and only replace them once they are complete,
+    # so an interrupted run leaves the previous output and manifest as they were.
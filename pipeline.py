@@ -0,0 +1,94 @@
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from converter import *
+
+# a pipelined conversion runs reading, converting and writing as three stages at the same time, joined by bounded queues,
+# so that reading from slow storage and writing to a slow sink overlap with f_compose() instead of taking turns with it.
+# the reader reads chunks of raw sentences (see. read_sentence_blocks()) in a thread and puts them in the read queue;
+# the converter hands every chunk to a pool of processes (see. convert_chunk()) and puts the pending result in the write queue;
+# the writer waits for the results in the order the chunks were read and writes them in a thread of its own (see. write_chunk()).
+# a full queue makes the stage before it wait, so at most queue_size chunks are read ahead and at most in_flight chunks are converted or waiting to be written.
+
+end_of_input = None
+
+async def read_stage(conllu_file, chunk_size, read_queue, io_executor):
+    loop = asyncio.get_running_loop()
+    chunks = read_sentence_blocks(conllu_file, chunk_size)
+
+    while True:
+        chunk = await loop.run_in_executor(io_executor, next, chunks, end_of_input)
+        await read_queue.put(chunk)
+
+        if chunk == end_of_input:
+            return
+
+    # the file is read in a thread, so a read which blocks on the storage does not block the other stages.
+
+async def convert_stage(read_queue, write_queue, options, output_format, chunk_size, collect_stats, collect_terms, convert_executor):
+    loop = asyncio.get_running_loop()
+    first_ordinal = 1
+
+    while True:
+        chunk = await read_queue.get()
+
+        if chunk == end_of_input:
+            await write_queue.put(end_of_input)
+
+            return
+
+        await write_queue.put(loop.run_in_executor(convert_executor, convert_chunk, chunk, first_ordinal, options, output_format, collect_stats, collect_terms))
+        first_ordinal += chunk_size
+
+    # a chunk is handed to the pool as soon as it is read, and the future of its result is queued for the writer in the order it was read.
+    # every chunk but the last has chunk_size sentences, so the position of the first sentence of each chunk is known without parsing, as in convert_parallel().
+
+async def write_stage(write_queue, writer, cache, stats, io_executor):
+    loop = asyncio.get_running_loop()
+
+    while True:
+        pending_chunk = await write_queue.get()
+
+        if pending_chunk == end_of_input:
+            return
+
+        await loop.run_in_executor(io_executor, write_chunk, writer, await pending_chunk, cache, stats)
+
+    # the results are written strictly in the order the chunks were read, so the output is identical to convert_stream()'s.
+
+async def run_pipeline(conllu_file, writer, options, processes, chunk_size, queue_size, in_flight, cache, stats):
+    cache_path = None
+    cache_max_bytes = None
+
+    if cache != None:
+        cache_path = cache.path
+        cache_max_bytes = cache.max_bytes
+
+    read_queue = asyncio.Queue(queue_size)
+    write_queue = asyncio.Queue(in_flight)
+
+    with ThreadPoolExecutor(1) as read_executor, ThreadPoolExecutor(1) as write_executor, ProcessPoolExecutor(processes, initializer=open_worker_cache, initargs=(cache_path, cache_max_bytes)) as convert_executor:
+        await asyncio.gather(
+            read_stage(conllu_file, chunk_size, read_queue, read_executor),
+            convert_stage(read_queue, write_queue, options, writer.output_format, chunk_size, stats != None, writer.query_index != None, convert_executor),
+            write_stage(write_queue, writer, cache, stats, write_executor)
+        )
+
+    # the reader and the writer have a thread each, so that reading and writing overlap with each other as well as with the conversion.
+    # if a stage fails, its error is raised here and asyncio.run() cancels the other stages.
+
+def convert_pipelined(conllu_file, writer, options=None, processes=None, chunk_size=64, queue_size=None, in_flight=None, cache=None, stats=None):
+    if processes == None:
+        processes = os.cpu_count()
+
+    if in_flight == None:
+        in_flight = processes * 2
+
+    if queue_size == None:
+        queue_size = in_flight
+
+    options = compile_options(options)
+    asyncio.run(run_pipeline(conllu_file, writer, options, processes, chunk_size, queue_size, in_flight, cache, stats))
+
+    # by default two chunks per process are in flight, as in convert_parallel(), and as many chunks are read ahead.
+    # at most chunk_size * (queue_size + in_flight + 1) sentences are held in memory at once, however large the treebank is.
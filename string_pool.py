@@ -0,0 +1,84 @@
+import sys
+from f_structure_nodes import FSet, container_types
+
+# the string pool keeps one copy of every string in the f_structures it is given: PRED values, GF labels like 'OBL:MIT' and feature values.
+# the same lemmas, labels and feature values come up again and again in a corpus, so the f_structures of a whole corpus held in memory
+# share a small number of string objects instead of each having its own copies.
+# the pool only grows, so it is only used when f_structures are kept in memory to share its strings with (see. the intern_strings option in converter.py);
+# a conversion which writes every f_structure out as soon as it is composed would only keep every lemma of the corpus alive for nothing.
+
+class StringPool:
+    def __init__(self):
+        self.strings = {}
+        self.lookups = 0
+        self.hits = 0
+        self.pooled_bytes = 0
+
+    def intern(self, string):
+        self.lookups += 1
+        pooled_string = self.strings.get(string)
+
+        if pooled_string == None:
+            self.strings[string] = string
+            self.pooled_bytes += sys.getsizeof(string)
+
+            return string
+
+        self.hits += 1
+
+        return pooled_string
+
+        # intern() returns the pooled copy of a string, adding the string to the pool if it is new.
+
+    def intern_f_structure(self, f_structure):
+        seen = set()
+        stack = [f_structure]
+
+        while len(stack) != 0:
+            value = stack.pop()
+
+            if id(value) in seen:
+                continue
+
+            seen.add(id(value))
+
+            if type(value) == list or type(value) == FSet:
+                stack.extend(value)
+
+                continue
+
+            items = []
+
+            for key, sub_value in value.items():
+                if type(sub_value) == str:
+                    sub_value = self.intern(sub_value)
+
+                elif type(sub_value) in container_types:
+                    stack.append(sub_value)
+
+                items.append((self.intern(key), sub_value))
+
+            value.clear()
+            value.update(items)
+
+        # intern_f_structure() replaces every key and string value of an f_structure with its pooled copy, in place and in the same order,
+        # so that a node which is shared (see. f_structure_nodes.py) stays shared.
+
+    def hit_rate(self):
+        if self.lookups == 0:
+            return 0.0
+
+        return self.hits / self.lookups * 100
+
+    def report(self):
+        return 'string pool: {} strings, {:.1f} MB, {} lookups ({:.1f}% hit rate)'.format(len(self.strings), self.pooled_bytes / 1048576, self.lookups, self.hit_rate())
+
+    def clear(self):
+        self.strings.clear()
+        self.lookups = 0
+        self.hits = 0
+        self.pooled_bytes = 0
+
+string_pool = StringPool()
+
+# every process has one pool, which lasts as long as the process.
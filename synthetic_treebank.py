@@ -0,0 +1,128 @@
+import sys
+import random
+import argparse
+
+# a generator of synthetic CoNLL-U sentences for benchmarking, in four shapes:
+# 'random' trees in which every token depends on an earlier one, 'chain' trees in which every token depends on the one before it,
+# 'fanout' trees in which every token depends on the first, and 'coordination' trees made of long lists of coordinated conjuncts.
+
+shapes = ['random', 'chain', 'fanout', 'coordination']
+
+random_deprels = ['nsubj', 'obj', 'iobj', 'obl', 'amod', 'advmod', 'nmod', 'det', 'case', 'ccomp', 'xcomp', 'conj', 'cc', 'nummod', 'aux', 'compound', 'acl', 'punct']
+chain_deprels = ['obj', 'nmod', 'obl', 'ccomp', 'xcomp', 'advcl', 'acl']
+fanout_deprels = ['nsubj', 'obj', 'iobj', 'obl', 'advmod', 'amod', 'nmod', 'advcl', 'ccomp', 'punct']
+
+lemmas = {
+    'NOUN': ['Haus', 'Mann', 'Frau', 'Stadt', 'Firma', 'Bericht', 'Regierung', 'Geld', 'Jahr', 'Land'],
+    'VERB': ['lesen', 'geben', 'sagen', 'sprechen', 'kommen', 'machen', 'sehen', 'gehen'],
+    'ADJ': ['neu', 'gut', 'schnell', 'groß', 'alt'],
+    'ADP': ['mit', 'in', 'auf', 'von', 'zu'],
+    'DET': ['der', 'ein', 'dies'],
+    'CCONJ': ['und', 'oder', 'aber'],
+    'AUX': ['haben', 'sein', 'werden'],
+    'PUNCT': [',', '.']
+}
+
+deprel_upos = {
+    'det': 'DET',
+    'case': 'ADP',
+    'cc': 'CCONJ',
+    'aux': 'AUX',
+    'punct': 'PUNCT',
+    'amod': 'ADJ',
+    'advmod': 'ADJ',
+    'ccomp': 'VERB',
+    'xcomp': 'VERB',
+    'advcl': 'VERB',
+    'acl': 'VERB'
+}
+
+upos_feats = {
+    'NOUN': ['Case=Nom|Gender=Masc|Number=Sing|Person=3', 'Case=Acc|Gender=Fem|Number=Sing|Person=3', 'Case=Dat|Gender=Neut|Number=Plur|Person=3'],
+    'VERB': ['Mood=Ind|Number=Sing|Person=3|Tense=Pres|VerbForm=Fin', 'VerbForm=Inf', 'Aspect=Perf|VerbForm=Part'],
+    'ADJ': ['Degree=Pos', 'Case=Nom|Degree=Cmp|Gender=Masc|Number=Sing'],
+    'ADP': ['Case=Dat', '_'],
+    'DET': ['Case=Nom|Definite=Def|Gender=Masc|Number=Sing|PronType=Art'],
+    'CCONJ': ['_'],
+    'AUX': ['Mood=Ind|Number=Sing|Person=3|Tense=Pres|VerbForm=Fin'],
+    'PUNCT': ['_']
+}
+
+function_deprels = {'det', 'case', 'cc', 'aux', 'compound', 'punct'}
+
+def synthetic_heads(shape, length, rng):
+    heads = [0]
+    deprels = ['root']
+    content_tokens = [1]
+
+    for token_id in range(2, length + 1):
+        if shape == 'random':
+            heads.append(rng.choice(content_tokens))
+            deprels.append(rng.choice(random_deprels))
+
+            if deprels[-1] not in function_deprels:
+                content_tokens.append(token_id)
+
+        elif shape == 'chain':
+            heads.append(token_id - 1)
+            deprels.append(rng.choice(chain_deprels))
+
+        elif shape == 'fanout':
+            heads.append(1)
+            deprels.append(rng.choice(fanout_deprels))
+
+        elif shape == 'coordination':
+            if token_id % 2 == 0:
+                heads.append(1)
+                deprels.append('conj')
+
+            else:
+                heads.append(token_id - 1)
+                deprels.append('cc')
+
+        else:
+            raise ValueError('unknown shape: {}'.format(shape))
+
+    return heads, deprels
+
+    # the first token is always the root. in random trees only content words are heads, as they are in the HDT,
+    # and in coordination trees every conjunct depends on the first and has a coordinating conjunction of its own.
+
+def synthetic_sentence(shape, length, rng, sent_id):
+    heads, deprels = synthetic_heads(shape, length, rng)
+    lines = ['# sent_id = {}'.format(sent_id)]
+
+    for token_id in range(1, length + 1):
+        deprel = deprels[token_id - 1]
+
+        if deprel == 'root':
+            upos = 'VERB'
+
+        else:
+            upos = deprel_upos.get(deprel, 'NOUN')
+
+        lemma = rng.choice(lemmas[upos])
+        lines.append('\t'.join([str(token_id), lemma, lemma, upos, '_', rng.choice(upos_feats[upos]), str(heads[token_id - 1]), deprel, '_', '_']))
+
+    return '\n'.join(lines) + '\n\n'
+
+def synthetic_treebank(shape, length, count, seed=0):
+    rng = random.Random(seed)
+    sentences = []
+
+    for sentence_number in range(count):
+        sentences.append(synthetic_sentence(shape, length, rng, '{}-{}-{}'.format(shape, length, sentence_number + 1)))
+
+    return ''.join(sentences)
+
+    # synthetic_treebank() returns the CoNLL-U text of count sentences of the given shape and length; the same seed always gives the same text.
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='write a synthetic CoNLL-U treebank to stdout.')
+    argument_parser.add_argument('--shape', choices=shapes, default='random')
+    argument_parser.add_argument('--length', type=int, default=20)
+    argument_parser.add_argument('--count', type=int, default=1000)
+    argument_parser.add_argument('--seed', type=int, default=0)
+    arguments = argument_parser.parse_args()
+
+    sys.stdout.write(synthetic_treebank(arguments.shape, arguments.length, arguments.count, arguments.seed))
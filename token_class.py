@@ -1,237 +1,248 @@
 import re
+from conllu_reader import parse_feats
+from f_structure_nodes import AVM, FSet
 
 # the token class assumes as its argument a dictionary with with the following keys:
 # id, form, lemma, upos, xpos, feats, head, deprel, deps, misc.
 
-simple_equivalents = ['ccomp', 'nsubj', 'nsubj:pass', 'csubj', 'csubj:pass', 'nummod', 'nmod:poss', 'xcomp', 'obl', 'amod', 'nmod', 'iobj', 'det:poss', 'obj', 'obl:arg', 'advmod', 'case', 'root', 'expl:pv']
-
-def is_simp_equiv(deprel):
-    if deprel in simple_equivalents:
-        return True
-
-    return False
-
-complex_equivalents = {
-    'auxilliaries': ['aux:pass', 'aux'],
-    'determiners': ['det'],
-    'compounds': ['flat', 'flat:name', 'compound', 'compound:prt'],
-    'clausal_modifiers': ['appos', 'advcl', 'acl'],
-    'complex_preds': ['expl', 'cop']
+deprel_rules = {
+    'root': ('simple', 'ROOT', True, 5),
+    'nsubj': ('simple', 'SUBJ', True, 0),
+    'nsubj:pass': ('simple', 'SUBJ', True, 0),
+    'csubj': ('simple', 'SUBJ', True, 0),
+    'csubj:pass': ('simple', 'SUBJ', True, 0),
+    'obj': ('simple', 'OBJ', True, 1),
+    'expl:pv': ('simple', 'OBJ', True, 1),
+    'iobj': ('simple', 'OBJ:IND', True, 2),
+    'obl': ('simple', 'OBL', True, 3),
+    'obl:arg': ('simple', 'OBL', True, 3),
+    'ccomp': ('simple', 'COMP', True, 4),
+    'xcomp': ('simple', 'XCOMP', True, 4),
+    'nmod': ('simple', 'ADJ', False, 7),
+    'amod': ('simple', 'ADJ', False, 7),
+    'advmod': ('simple', 'ADJ', False, 7),
+    'nmod:poss': ('simple', 'POSS', False, 5),
+    'det:poss': ('simple', 'POSS', False, 5),
+    'nummod': ('simple', 'SPEC', False, 5),
+    'case': ('simple', 'CASE', False, 5),
+    'aux': ('auxilliary', '*CPOUND', False, 5),
+    'aux:pass': ('auxilliary', '*CPOUND', False, 5),
+    'det': ('determiner', None, False, 5),
+    'flat': ('compound', '*CPOUND', False, 5),
+    'flat:name': ('compound', '*CPOUND', False, 5),
+    'compound': ('compound', '*CPOUND', False, 5),
+    'compound:prt': ('compound', '*CPOUND', False, 5),
+    'appos': ('clausal_modifier', 'ADJ', False, 7),
+    'advcl': ('clausal_modifier', 'ADJ', False, 7),
+    'acl': ('clausal_modifier', 'ADJ', False, 7),
+    'expl': ('complex_pred', '*SUBJ', True, 5),
+    'cop': ('complex_pred', 'COP', False, 5),
+    'conj': ('coordinant', '*COORD', False, 5),
+    'parataxis': ('coordinant', '*COORD', False, 5),
+    'cc': ('coordinant', 'COORD', False, 5),
+    'reparandum': ('no_equivalent_sentence', None, None, 5),
+    'orphan': ('no_equivalent_sentence', None, None, 5),
+    'vocative': ('no_equivalent_sentence', None, None, 5),
+    'punct': ('no_equivalent_token', None, None, 5),
+    'discourse': ('no_equivalent_token', None, None, 5),
+    'mark': ('no_equivalent_token', None, None, 5)
 }
 
-def is_comp_equiv(deprel):
-    for key in complex_equivalents:
-        if deprel in complex_equivalents[key]:
-            return True
-
-    return False
-
-no_equivalents = {
-    'sentence': ['reparandum', 'orphan', 'vocative'],
-    'token': ['punct', 'discourse', 'mark']
+# every deprel is mapped to its subtype, its grammatical function, whether that function is an argument and its rank on the functional hierarchy (see. f_hierarchy()).
+# the GF of a determiner depends on its lemma and upos, so it is left as None and decided in convert_determiners().
+# a sentence with a deprel of the subtype 'no_equivalent_sentence' is not parsable, and a token with a deprel of the subtype 'no_equivalent_token' is ignored.
+# any deprel which is not in the table is converted by convert_simple() to the GF 'NONE' with the rank 5.
+
+complex_subtypes = {
+    'auxilliary': 'auxilliaries',
+    'determiner': 'determiners',
+    'compound': 'compounds',
+    'clausal_modifier': 'clausal_modifiers',
+    'complex_pred': 'complex_preds'
 }
 
-def is_not_equiv(deprel):
-    for key in no_equivalents:
-        if deprel in no_equivalents[key]:
-            return True
-    
-    return False
+deprel_subtypes = {}
+deprel_gfs = {}
+deprel_args = {}
+deprel_ranks = {}
+filter_actions = {}
 
-coordinants = ['conj', 'cc', 'parataxis']
+simple_equivalents = []
+complex_equivalents = {}
+no_equivalents = {}
+coordinants = []
 
-def is_coordinant(deprel):
-    if deprel in coordinants:
-        return True
+def compile_deprel_rules():
+    for compiled in [deprel_subtypes, deprel_gfs, deprel_args, deprel_ranks, filter_actions, complex_equivalents, no_equivalents]:
+        compiled.clear()
 
-    return False
+    del simple_equivalents[:]
+    del coordinants[:]
 
-def is_deprel(deprel):
-    if is_simp_equiv(deprel) == True or is_comp_equiv(deprel) == True or is_not_equiv(deprel) == True or is_coordinant(deprel) == True:
-        return True
-    
-    return True
+    for group in complex_subtypes.values():
+        complex_equivalents[group] = []
 
-# every subset of deprels and their subsets are assigned and functions are defined to return True or False values for if a deprel is in a given subset.
+    no_equivalents['sentence'] = []
+    no_equivalents['token'] = []
 
-generate_feat_gfs = input('automatically generate nonargument GFs from UD annotation?\ny/n: ')
+    for deprel, (subtype, gf, arg, rank) in deprel_rules.items():
+        deprel_subtypes[deprel] = subtype
+        deprel_gfs[deprel] = gf
+        deprel_args[deprel] = arg
+        deprel_ranks[deprel] = rank
 
-class Token:
-    def __init__(self, token):
-        self.id = None
-        self.id = token['id']
+        if subtype == 'simple':
+            simple_equivalents.append(deprel)
 
-        self.form = None
-        self.form = token['form']
+        elif subtype in complex_subtypes:
+            complex_equivalents[complex_subtypes[subtype]].append(deprel)
 
-        self.lemma = None
-        self.lemma = token['lemma']
+        elif subtype == 'coordinant':
+            coordinants.append(deprel)
 
-        self.upos = None
-        self.upos = token['upos']
+        elif subtype == 'no_equivalent_sentence':
+            no_equivalents['sentence'].append(deprel)
+            filter_actions[deprel] = 'reject'
 
-        self.feats = None
+        elif subtype == 'no_equivalent_token':
+            no_equivalents['token'].append(deprel)
+            filter_actions[deprel] = 'ignore'
 
-        if token['feats'] != '_':
-            self.feats = token['feats']
+    # the table is compiled into dictionaries, so that looking up any property of a deprel takes constant time however many deprels there are.
+    # the dictionaries are cleared and refilled rather than replaced, so that modules which have imported them see the changes.
+    # the lists of equivalents are derived from the table for the sake of code which refers to them by name.
 
-        self.head = None
-        self.head = token['head']
-
-        self.deprel = None
-        self.deprel = token['deprel']
+def add_deprel_rule(deprel, subtype, gf, arg, rank):
+    deprel_rules[deprel] = (subtype, gf, arg, rank)
+    compile_deprel_rules()
 
-        # most information in the UD annotation is stored in token objects and will be referred to in complex conversions and elsewhere.
+    # language-specific deprels can be added to the table (or existing ones changed) without touching the conversion methods.
+    # a deprel of the subtype 'simple' is converted to its GF with a PRED value of its lemma, wrapped in a list if the GF is ADJ.
 
-        self.subtype = None
+compile_deprel_rules()
 
-        if is_simp_equiv(self.deprel) == True:
-            self.subtype = 'simple'
+def is_simp_equiv(deprel):
+    return deprel_subtypes.get(deprel) == 'simple'
 
-        elif is_comp_equiv(self.deprel) == True:
-            if self.deprel in complex_equivalents['auxilliaries']:
-                self.subtype = 'auxilliary'
+def is_comp_equiv(deprel):
+    return deprel_subtypes.get(deprel) in complex_subtypes
 
-            elif self.deprel in complex_equivalents['determiners']:
-                self.subtype = 'determiner'
+def is_not_equiv(deprel):
+    return filter_actions.get(deprel) != None
 
-            elif self.deprel in complex_equivalents['compounds']:
-                self.subtype = 'compound'
+def is_coordinant(deprel):
+    return deprel_subtypes.get(deprel) == 'coordinant'
 
-            elif self.deprel in complex_equivalents['clausal_modifiers']:
-                self.subtype = 'clausal_modifier'
+def is_deprel(deprel):
+    return True
 
-            elif self.deprel in complex_equivalents['complex_preds']:
-                self.subtype = 'complex_pred'
+    # every deprel is accepted: deprels outside the table are converted to the GF 'NONE' rather than failing the sentence.
 
-        elif is_coordinant(self.deprel) == True:
-            self.subtype = 'coordinant'
+# every subset of deprels and their subsets are assigned and functions are defined to return True or False values for if a deprel is in a given subset.
 
-        # the token is given a subtype which will be used to call an appropriate conversion method.
+default_feature_projection = {
+    'Case': 'CASE',
+    'Gender': 'GEN',
+    'Number': 'NUM',
+    'Person': 'PERS',
+    'Mood': 'MOOD',
+    'Tense': 'TENSE',
+    'Aspect': 'ASP'
+}
 
-        self.gf = None
-        self.value = None
-        self.arg = None
+feat_gf_upos = {'NOUN', 'VERB', 'PRON', 'PROPN'}
 
-        # the grammatical function, value and argument properties are generated by the conversion methods below.
+def compile_feature_projection(feature_projection):
+    compiled_projection = []
 
-        self.dependants = []
-        self.arguments = []
+    for feat, gf in feature_projection.items():
+        if gf != None and gf != '':
+            compiled_projection.append((feat, gf))
 
-        # the dependants and arguments lists are appended during the conversion (see. nest_order() and f_compose(sentence)) and required by pred_format().
+    return tuple(compiled_projection)
 
-    def convert_simple(self):
-        if self.deprel == 'root':
-            self.arg = True
+    # a feature projection maps UD features to the nonargument GFs they are projected to, and can be extended with user-defined features.
+    # it is compiled to a tuple of pairs, leaving out any feature mapped to no GF, so that it can be applied to a token without further lookups.
 
-            return 'ROOT', {'PRED': '{}< >'.format(self.lemma)}
+class Token:
+    __slots__ = ('id', 'form', 'lemma', 'upos', 'raw_feats', 'head', 'deprel', 'subtype', 'rank', 'gf', 'value', 'arg', 'dependants', 'arguments')
 
-        elif self.deprel == 'nsubj':
-            self.arg = True
+    # the properties of a token are fixed, so they are stored in slots, and a token has no __dict__ of its own.
 
-            return 'SUBJ', {'PRED': '{}< >'.format(self.lemma)}
+    def __init__(self, token):
+        self.id = token['id']
+        self.form = token['form']
+        self.lemma = token['lemma']
+        self.upos = token['upos']
+        self.raw_feats = None
 
-        elif self.deprel == 'nsubj:pass':
-            self.arg = True
+        if token['feats'] != '_':
+            self.raw_feats = token['feats']
 
-            return 'SUBJ', {'PRED': '{}< >'.format(self.lemma)}
+        # feats are a dictionary from the conllu library, but a string from the reader in conllu_reader.py which is only parsed when it is read (see. feats below).
 
-        elif self.deprel == 'csubj':
-            self.arg = True
+        self.head = token['head']
+        self.deprel = token['deprel']
 
-            return 'SUBJ', {'PRED': '{}< >'.format(self.lemma)}
+        # most information in the UD annotation is stored in token objects and will be referred to in complex conversions and elsewhere.
 
-        elif self.deprel == 'csubj:pass':
-            self.arg = True
+        self.subtype = deprel_subtypes.get(self.deprel)
+        self.rank = deprel_ranks.get(self.deprel, 5)
 
-            return 'SUBJ', {'PRED': '{}< >'.format(self.lemma)}
+        # the token is given a subtype which will be used to call an appropriate conversion method, and its rank on the functional hierarchy.
 
-        elif self.deprel == 'obj':
-            self.arg = True
+        self.gf = None
+        self.value = None
+        self.arg = None
 
-            return 'OBJ', {'PRED': '{}< >'.format(self.lemma)}
+        # the grammatical function, value and argument properties are generated by the conversion methods below.
 
-        elif self.deprel == 'expl:pv':
-            self.arg = True
+        self.dependants = []
+        self.arguments = []
 
-            return 'OBJ', {'PRED': '{}< >'.format(self.lemma)}
+        # the dependants and arguments lists are appended during the conversion (see. nest_order() and f_compose(sentence)) and required by pred_format().
 
-        elif self.deprel == 'iobj':
-            self.arg = True
+    @property
+    def feats(self):
+        if type(self.raw_feats) == str:
+            self.raw_feats = parse_feats(self.raw_feats)
 
-            return 'OBJ:IND', {'PRED': '{}< >'.format(self.lemma)}
+        return self.raw_feats
 
-        elif self.deprel == 'obl':
-            self.arg = True
+        # the feats of a token are parsed the first time they are read and kept, so a token whose feats are never read never parses them.
 
-            return 'OBL', {'PRED': '{}< >'.format(self.lemma)}
+    def convert_simple(self):
+        gf = deprel_gfs.get(self.deprel)
 
-        elif self.deprel == 'obl:arg':
-            self.arg = True
+        if gf == None:
+            return 'NONE', AVM({'NONE': 'NONE< >'})
 
-            return 'OBL', {'PRED': '{}< >'.format(self.lemma)}
+        self.arg = deprel_args[self.deprel]
 
-        elif self.deprel == 'ccomp':
-            self.arg = True
+        if self.deprel == 'case':
+            if type(self.feats) == dict and 'Case' in self.feats:
+                return 'CASE', AVM({'PRED': self.feats['Case'].upper()})
 
-            return 'COMP', {'PRED': '{}< >'.format(self.lemma)}
+            else:
+                return 'CASE', AVM({'PRED': self.lemma.upper()})
 
         elif self.deprel == 'xcomp':
-            self.arg = True
-
-            return 'XCOMP', {'PRED': '{}< >'.format(self.lemma),
-                            'SSUBJ': '(SUBJ^)'}
+            return 'XCOMP', AVM({'PRED': '{}< >'.format(self.lemma),
+                                 'SSUBJ': '(SUBJ^)'})
 
-        elif self.deprel == 'nmod':
-            self.arg = False
-
-            return 'ADJ', [{'PRED': '{}< >'.format(self.lemma)}]
-
-        elif self.deprel == 'nmod:poss':
-            self.arg = False
-
-            return 'POSS', {'PRED': '{}< >'.format(self.lemma)}
-
-        elif self.deprel == 'nummod':
-            self.arg = False
-
-            return 'SPEC', {'PRED': '{}< >'.format(self.lemma)}
-
-        elif self.deprel == 'amod':
-            self.arg = False
-
-            return 'ADJ', [{'PRED': '{}< >'.format(self.lemma)}]
-        
-        elif self.deprel == 'advmod':
-            self.arg = False
-
-            return 'ADJ', [{'PRED': '{}< >'.format(self.lemma)}]
-
-        elif self.deprel == 'det:poss':
-            self.arg = False
-
-            return 'POSS', {'PRED': '{}< >'.format(self.lemma)}
-        
-        elif self.deprel == 'case':
-            self.arg = False
-
-            try:
-                if 'Case' in self.feats.keys():
-                    return 'CASE', {'PRED': self.feats['Case'].upper()}
-
-                else:
-                    return 'CASE', {'PRED': self.lemma.upper()}
-
-            except:
-                return 'CASE', {'PRED': self.lemma.upper()}
+        elif gf == 'ADJ':
+            return 'ADJ', FSet([AVM({'PRED': '{}< >'.format(self.lemma)})])
 
         else:
-            return 'NONE', {'NONE': 'NONE< >'}
+            return gf, AVM({'PRED': '{}< >'.format(self.lemma)})
+
+        # the GF and argument status of a simple deprel are looked up in the table; only case markers and open complements need special values.
+        # ADJ values are sets, so that more adjuncts can be added to them during composition.
 
     def convert_auxilliaries(self):
         self.arg = False
 
-        return '*CPOUND', {'PRED': '{}-'.format(self.form)}
+        return '*CPOUND', AVM({'PRED': '{}-'.format(self.form)})
 
     def convert_determiners(self):
         definite_articles = ['der', 'die', 'das', 'des', 'den', 'dem']
@@ -241,32 +252,32 @@ class Token:
 
         if self.upos == 'DET':
             if self.lemma.lower() in definite_articles:
-                return 'DEF', {'BOOL': '+'}
+                return 'DEF', AVM({'BOOL': '+'})
 
             elif self.lemma.lower() in indefinite_articles:
-                return 'DEF', {'BOOL': '-'}
+                return 'DEF', AVM({'BOOL': '-'})
 
             else:
-                return 'SPEC', {'PRED': '{}< >'.format(self.lemma)}
+                return 'SPEC', AVM({'PRED': '{}< >'.format(self.lemma)})
             
         elif self.upos == 'PRON':
-            return 'POSS', {'PRED': '{}< >'.format(self.lemma)}
+            return 'POSS', AVM({'PRED': '{}< >'.format(self.lemma)})
 
     def convert_compounds(self):
         self.arg = False
 
         if self.deprel == 'compound:prt':
-            return '*CPOUND', {'PRED': '{}'.format(self.lemma)}
+            return '*CPOUND', AVM({'PRED': '{}'.format(self.lemma)})
 
         else:
-            return '*CPOUND', {'PRED': '-{}'.format(self.lemma)}
+            return '*CPOUND', AVM({'PRED': '-{}'.format(self.lemma)})
 
         # the dummy gf '*CPOUND' will not be part of the f_structure, it's just a marker.
 
     def convert_claus_mods(self):
         self.arg = False
 
-        return 'ADJ', [{'PRED': '{}< >'.format(self.lemma)}]
+        return 'ADJ', FSet([AVM({'PRED': '{}< >'.format(self.lemma)})])
 
         # see. report section 3.1.2.5 for a record of the problems here.
 
@@ -274,18 +285,18 @@ class Token:
         if self.deprel == 'expl':
             self.arg = True
 
-            return '*SUBJ', {'PRED': '{}< >'.format(self.lemma)}
+            return '*SUBJ', AVM({'PRED': '{}< >'.format(self.lemma)})
 
         elif self.deprel == 'cop':
             self.arg = False
 
-            return 'COP', {'PRED': '{}< >'.format(self.form)}
+            return 'COP', AVM({'PRED': '{}< >'.format(self.form)})
 
     def convert_coordinants(self):
         if self.deprel == 'conj':
             self.arg = False
 
-            return '*COORD', [{'PRED': '{}< >'.format(self.lemma), 'COORD': 'LIST'}]
+            return '*COORD', FSet([AVM({'PRED': '{}< >'.format(self.lemma), 'COORD': 'LIST'})])
 
             # conjunts have the coordination type LIST, because if this type is not updated by a dependant with the relation 'cc' (below), it probably is.
             # the dummy gf '*COORD' will not be part of the f_structure, it's just a marker.
@@ -293,104 +304,45 @@ class Token:
         elif self.deprel == 'parataxis':
             self.arg = False
 
-            return '*COORD', [{'PRED': '{}< >'.format(self.lemma), 'COORD': 'PARATAXIS'}]
+            return '*COORD', FSet([AVM({'PRED': '{}< >'.format(self.lemma), 'COORD': 'PARATAXIS'})])
 
         elif self.deprel == 'cc':
             self.arg = False
 
-            return 'COORD', {'PRED': '{}'.format(self.lemma).upper()}
+            return 'COORD', AVM({'PRED': '{}'.format(self.lemma).upper()})
 
             # the only purpose of the value of coordinating words like is to update the coordination type of the conjunct.
 
-    def generate_feat_gfs(self):
-        feat_gf_upos = ['NOUN', 'VERB', 'PRON', 'PROPN']
-
-        if type(self.feats) == dict:
-            if self.upos in feat_gf_upos:
-                if 'Case' in self.feats.keys():
-                    try:
-                        self.value['CASE'] = self.feats['Case'].upper()
-
-                    except:
-                        self.value[0]['CASE'] = self.feats['Case'].upper()
-            
-                if 'Gender' in self.feats.keys():
-                    try:
-                        self.value['GEN'] = self.feats['Gender'].upper()
-
-                    except:
-                        self.value[0]['GEN'] = self.feats['Gender'].upper()
-            
-                if 'Number' in self.feats.keys():
-                    try:
-                        self.value['NUM'] = self.feats['Number'].upper()
-
-                    except:
-                        self.value[0]['NUM'] = self.feats['Number'].upper()
-            
-                if 'Person' in self.feats.keys():
-                    try:
-                        self.value['PERS'] = self.feats['Person'].upper()
-
-                    except:
-                        self.value[0]['PERS'] = self.feats['Person'].upper()
-            
-                if 'Mood' in self.feats.keys():
-                    try:
-                        self.value['MOOD'] = self.feats['Mood'].upper()
-
-                    except:
-                        self.value[0]['MOOD'] = self.feats['Mood'].upper()
-
-                if 'Person' in self.feats.keys():
-                    try:
-                        self.value['PERS'] = self.feats['Person'].upper()
-
-                    except:
-                        self.value[0]['PERS'] = self.feats['Person'].upper()
-
-                if 'Tense' in self.feats.keys():
-                    try:
-                        self.value['TENSE'] = self.feats['Tense'].upper()
-
-                    except:
-                        self.value[0]['TENSE'] = self.feats['Tense'].upper()
-
-                if 'Aspect' in self.feats.keys():
-                    try:
-                        self.value['ASP'] = self.feats['Aspect'].upper()
+    def generate_feat_gfs(self, feature_projection):
+        if self.upos in feat_gf_upos and type(self.feats) == dict:
+            value = self.value.avm()
 
-                    except:
-                        self.value[0]['ASP'] = self.feats['Aspect'].upper()
+            for feat, gf in feature_projection:
+                if feat in self.feats:
+                    value[gf] = self.feats[feat].upper()
 
-    def convert(self):
-        if self.subtype == 'simple':
-            self.gf, self.value = self.convert_simple()
+        # the value which receives the feature GFs is decided once, and then every projected feature the token has is added to it in one pass.
+        # the features are projected in the order of the projection, so the order of the GFs in the f_structure does not depend on the order of the feats.
 
-        elif self.subtype == 'auxilliary':
-            self.gf, self.value = self.convert_auxilliaries()
+    def convert(self, feature_projection=()):
+        self.gf, self.value = subtype_converters.get(self.subtype, Token.convert_simple)(self)
 
-        elif self.subtype == 'determiner':
-            self.gf, self.value = self.convert_determiners()
-
-        elif self.subtype == 'compound':
-            self.gf, self.value = self.convert_compounds()
-
-        elif self.subtype == 'clausal_modifier':
-            self.gf, self.value = self.convert_claus_mods()
-
-        elif self.subtype == 'complex_pred':
-            self.gf, self.value = self.convert_comp_preds()
-        
-        elif self.subtype == 'coordinant':
-            self.gf, self.value = self.convert_coordinants()
-
-        else:
-            self.gf, self.value = self.convert_simple()
-
-        if generate_feat_gfs.lower() == 'y':
-            self.generate_feat_gfs()
+        if len(feature_projection) != 0:
+            self.generate_feat_gfs(feature_projection)
 
         # self.convert() returns two values: a key and a value for the f_structure dictionary of this token.
+        # nonargument GFs are only generated from the UD features if a compiled feature projection is given (see. compile_feature_projection()).
+
+# in sum, the Token class stores data from the filtered sentences and has methods for conversion to grammatical functions.
+
+subtype_converters = {
+    'simple': Token.convert_simple,
+    'auxilliary': Token.convert_auxilliaries,
+    'determiner': Token.convert_determiners,
+    'compound': Token.convert_compounds,
+    'clausal_modifier': Token.convert_claus_mods,
+    'complex_pred': Token.convert_comp_preds,
+    'coordinant': Token.convert_coordinants
+}
 
-# in sum, the Token class stores data from the filtered sentences and has methods for conversion to grammatical functions.
\ No newline at end of file
+# each subtype is mapped to its conversion method; tokens without a subtype in this dictionary are converted by convert_simple().
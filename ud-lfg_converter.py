@@ -1,430 +1,192 @@
-import re
-from conllu import *
-from token_class import *
+import os
+import sys
+import argparse
+from converter import *
+from incremental import convert_incremental, manifest_path
+from pipeline import convert_pipelined
+from corpus import convert_corpus, corpus_inputs, corpus_report_lines
+from conllu_index import convert_subset, read_conllu_index, select_sentences
+
+# this script is the command line interface to the converter; the conversion itself is defined in converter.py and token_class.py,
+# which can be imported without side effects.
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='convert a CoNLL-U file of the HDT-UD into LFG f-structures.')
+    argument_parser.add_argument('input', nargs='?', default='de_hdt-ud-dev.conllu')
+    argument_parser.add_argument('output', nargs='?', default='hdt_ud_1to10000A_102001to112000B.txt')
+    argument_parser.add_argument('--corpus', nargs='+', default=None, metavar='PATTERN', help='convert every CoNLL-U file matching the paths or globs, in place of input, with one file per process.')
+    argument_parser.add_argument('--output-dir', default='.', metavar='DIR', help='directory the outputs of --corpus are written to, one per input (default: the current directory).')
+    argument_parser.add_argument('--feat-gfs', choices=['y', 'n'], default=None, help='automatically generate nonargument GFs from UD annotation (asked if left out).')
+    argument_parser.add_argument('--feature', action='append', default=[], metavar='FEAT=GF', help='project the UD feature FEAT to the GF GF (or to nothing if GF is empty); may be repeated.')
+    argument_parser.add_argument('--reader', choices=list(readers), default='conllu', help='CoNLL-U reader: the conllu library, or a fast reader which only keeps the columns the converter needs (default: conllu).')
+    argument_parser.add_argument('--share-structure', action='store_true', help='share the subject of a controlled open complement with its controller instead of writing the placeholder (SUBJ^).')
+    argument_parser.add_argument('--orphans', choices=['reject', 'reattach'], default='reattach', help='reattach tokens whose head was filtered out to their nearest kept ancestor, or reject their sentences (default: reattach).')
+    argument_parser.add_argument('--max-tokens', type=int, default=None, metavar='N', help='reject sentences with more than N tokens after filtering.')
+    argument_parser.add_argument('--validate', action='store_true', help='check every f-structure for completeness, coherence, duplicate arguments and leftover dummy GFs, and count its errors.')
+    argument_parser.add_argument('--ids', action='append', default=None, metavar='ID,...', help='only convert the sentences with these sent_ids, read by their offsets in the input; may be repeated.')
+    argument_parser.add_argument('--range', default=None, metavar='FIRST:LAST', help='only convert the sentences from sent_id FIRST to sent_id LAST, both included.')
+    argument_parser.add_argument('--sample', type=int, default=None, metavar='N', help='only convert a random sample of N sentences (of those selected by the other subset options).')
+    argument_parser.add_argument('--seed', type=int, default=0, help='seed of the random sample (default: 0).')
+    argument_parser.add_argument('--min-length', type=int, default=None, metavar='N', help='only convert sentences of at least N tokens.')
+    argument_parser.add_argument('--max-length', type=int, default=None, metavar='N', help='only convert sentences of at most N tokens.')
+    argument_parser.add_argument('--parallel', action='store_true', help='convert chunks of sentences in a pool of processes.')
+    argument_parser.add_argument('--processes', type=int, default=None, help='size of the pool in parallel or pipeline mode (default: the number of cores).')
+    argument_parser.add_argument('--pipeline', action='store_true', help='read, convert and write at the same time, with chunks of sentences converted in a pool of processes.')
+    argument_parser.add_argument('--queue-size', type=int, default=None, help='chunks read ahead of the conversion in pipeline mode (default: --in-flight).')
+    argument_parser.add_argument('--in-flight', type=int, default=None, help='chunks being converted or waiting to be written at a time in pipeline mode (default: twice the number of processes).')
+    argument_parser.add_argument('--chunk-size', type=int, default=64, help='sentences sent to a process at a time.')
+    argument_parser.add_argument('--format', choices=output_formats, default='repr', help='output format (default: repr, one python dictionary per line).')
+    argument_parser.add_argument('--gzip', action='store_true', help='gzip the output.')
+    argument_parser.add_argument('--index', action='store_true', help='write an index of the offset and length of every sentence\'s record next to the output.')
+    argument_parser.add_argument('--query-index', action='store_true', help='write a query index of the GFs and attribute=value pairs of every f-structure next to the output (implies --index; see f_structure_query.py).')
+    argument_parser.add_argument('--cache', default=None, metavar='PATH', help='keep converted sentences in a cache database at PATH and reuse them.')
+    argument_parser.add_argument('--cache-size', type=float, default=1024, metavar='MB', help='size of the cache, beyond which the least recently used sentences are evicted (default: 1024).')
+    argument_parser.add_argument('--incremental', action='store_true', help='only convert sentences which were added or changed since the last incremental run into the same output.')
+    argument_parser.add_argument('--stats', default=None, metavar='PATH', help='write a JSON summary of stage times, latencies and rejections to PATH (- for stderr) at the end of the run.')
+    argument_parser.add_argument('--progress', type=float, default=None, metavar='SECONDS', help='print the progress and throughput of the run to stderr every SECONDS.')
+    argument_parser.add_argument('--worker', action='store_true', help='read sentences on stdin and write one f-structure per line on stdout until stdin closes.')
+    arguments = argument_parser.parse_args()
+
+    if arguments.incremental == True and (arguments.gzip == True or arguments.parallel == True or arguments.pipeline == True or arguments.worker == True):
+        argument_parser.error('--incremental cannot be combined with --gzip, --parallel, --pipeline or --worker')
+
+    if (arguments.index == True or arguments.query_index == True) and arguments.gzip == True:
+        argument_parser.error('--index and --query-index cannot be combined with --gzip')
+
+    if arguments.query_index == True:
+        arguments.index = True
+
+    # a query is answered by reading the matching records by their offsets, so an output with a query index is indexed too.
+
+    if arguments.parallel == True and arguments.pipeline == True:
+        argument_parser.error('--parallel cannot be combined with --pipeline')
+
+    subset = arguments.ids != None or arguments.range != None or arguments.sample != None or arguments.min_length != None or arguments.max_length != None
+
+    if subset == True and (arguments.corpus != None or arguments.incremental == True or arguments.parallel == True or arguments.pipeline == True or arguments.worker == True):
+        argument_parser.error('--ids, --range, --sample, --min-length and --max-length cannot be combined with --corpus, --incremental, --parallel, --pipeline or --worker')
+
+    if arguments.range != None and ':' not in arguments.range:
+        argument_parser.error('--range must be of the form FIRST:LAST')
+
+    ids = None
+    id_range = None
+
+    if arguments.ids != None:
+        ids = [sent_id for ids_argument in arguments.ids for sent_id in ids_argument.split(',') if sent_id != '']
+
+    if arguments.range != None:
+        id_range = arguments.range.split(':', 1)
+
+    # sent_ids can be given as a comma-separated list, or one --ids at a time, or both.
+
+    conllu_entries = None
+
+    if ids != None or id_range != None:
+        conllu_entries = read_conllu_index(arguments.input)
 
-# the conllu library parses the file into sentences and each sentence into tokens; each token is a dictionary with with the following keys:
-# id, form, lemma, upos, xpos, feats, head, deprel, deps, misc.
-# the Token class is a class of object in which relevant data is stored and methods for conversion are defined.
-
-def parse_filter(sentence):
-    filtered_sentence = []
-    
-    for token in sentence:
-        if is_deprel(token['deprel']) == False:
-            return False
-        
-            # if the sentence has a token in it with a deprel value which is not in the set of accepted deprels, it is not parsable.
-
-        elif token['deprel'] in no_equivalents['sentence']:
-            return False
-
-            # if the sentence has a token in it with a deprel value in the list no_equivalents['sentence'], it is not parsable.
-            # deprels in this set are part of UD but deemed unparsable by the engineer.
-
-        elif token['deprel'] in no_equivalents['token']:
-            pass
-
-            # if a token has a deprel value in the list no_equivalents['token'], that token is ignored.
-
-        else:
-            filtered_sentence.append(token)
-
-            # any token which passes these criteria is appended to the filtered sentence, which is ready to be converted to an f_structure.
-
-    return filtered_sentence
-
-    # note that parse_filter requires some functions defined for Token, also imported.
-
-def f_hierarchy(token):
-    if token.gf == '*CONJ':
-        return 7
-
-    elif token.gf == 'ADJ':
-        return 7
-
-    elif token.gf == 'SUBJ':
-        return 0
-
-    elif token.gf == 'OBJ':
-        return 1
-    
-    elif re.search(r'^OBJ:', token.gf) != None:
-        return 2
-
-    elif re.search(r'^OBL:?', token.gf) != None:
-        return 3
-
-    elif token.gf == 'COMP' or token.gf == 'XCOMP':
-        return 4
-
-    else:
-        return 5
-
-    # the dummy GF '*CONJ' is given special status as the very lowest in the function hierary,
-    # to ensure that the coordination with this dependant happens after the rest of the token's GF's value has already been generated.
-
-def nest_order(tokens):
-    ordered_tokens = []
-    ordered_tokens_waiting_room = []
-    ordered_tokens_reception = []
-    terminal_dependants = []
-
-    for token in tokens:
-        for other_token in tokens:
-            if token.id == other_token.head:
-                token.dependants.append(other_token)
-
-                # the tokens' .dependants properties are appended.
-
-        token.dependants.sort(key=f_hierarchy)
-        
-        # the tokens have their dependants sorted according to the functional hierarchy,
-        # with a special place for coordinating conjunctions and parataxis at the end (see. f_hierarchy()).
-    
-    for token in tokens:
-        if len(token.dependants) == 0:
-            terminal_dependants.append(token)
-
-            # the terminal dependants are listed.
-    
-    for token in terminal_dependants:
-        pred_format(token)
-
-        # the terminal dependants have their preds formatted.
-
-    for token in tokens:
-        if token.head == 0:
-            matrix_pred = token
-    
-            # the matrix predicate is found.
-
-    ordered_tokens.append(matrix_pred)
-
-    for dependant in matrix_pred.dependants:
-        ordered_tokens_waiting_room.append(dependant)
-
-        # the matrix predicate is in the ordered list. it's dependants are in the waiting room.
-    
-    while len(ordered_tokens_waiting_room) > 0:
-        for token in ordered_tokens_waiting_room:
-            for dependant in token.dependants:
-                ordered_tokens_reception.append(dependant)
-
-        ordered_tokens = ordered_tokens + ordered_tokens_waiting_room
-        ordered_tokens_waiting_room = ordered_tokens_reception
-        ordered_tokens_reception = []
-
-        # the matrix predicate's dependants' dependants arrive at reception.
-        # the dependants in the waiting room move out of the loop into the ordered_tokens list, and the dependants at reception take their place.
-        # the new dependants in the waiting room have their dependants arrive at reception
-        # and the process loops until the ordered_tokens list is as long as the original list.
-    
-    ordered_heads = []
-
-    for token in ordered_tokens:
-        if token not in terminal_dependants:
-            ordered_heads.append(token)
-
-    ordered_heads.reverse()
+        try:
+            select_sentences(conllu_entries, ids, id_range)
 
-    # the ordered_tokens list has the terminal dependants removed and its order is reversed to reflect the nesting order for f_compose().
-    # ordered_tokens is now a list of every token which is the head of another token, ordered from the heads of the terminal dependants to the matrix predicate.
-    # this order ensures that no token can nest its dependants inside its value until they have had their turn to nest their dependants and so on.
+        except KeyError as error:
+            argument_parser.error(error.args[0])
 
-    return ordered_heads
+    # sent_ids which are not in the input are reported before the output is opened, so that a mistyped sent_id does not leave an empty output behind.
 
-def pred_format(token):
-    exception_preds = ['DEF', 'CASE', 'GEN', 'PERS', 'MOOD', 'TENSE', 'NUM', 'ASP', 'COORD', '*CPOUND']
+    if arguments.corpus != None and (arguments.incremental == True or arguments.parallel == True or arguments.pipeline == True or arguments.worker == True):
+        argument_parser.error('--corpus cannot be combined with --incremental, --parallel, --pipeline or --worker')
 
-    if token.upos == 'PRON' and token.gf != 'SPEC':
+    if arguments.corpus != None:
         try:
-            token.value['PRED'] = 'PRO'
+            corpus_inputs(arguments.corpus)
 
-            return
+        except FileNotFoundError as error:
+            argument_parser.error(error.args[0])
 
-        except:
-            token.value[0]['PRED'] = 'PRO'
+    for feature in arguments.feature:
+        if '=' not in feature:
+            argument_parser.error('--feature must be of the form FEAT=GF, not {}'.format(feature))
 
-            return
+    options = dict(default_options)
 
-        # if the token is a pronoun and not a specifier, its PRED value must be PRO.
+    if arguments.feat_gfs == None and arguments.worker == False:
+        arguments.feat_gfs = input('automatically generate nonargument GFs from UD annotation?\ny/n: ')
 
-    elif len(token.arguments) != 0 and token.gf not in exception_preds:
-        try:
-            token_pred = token.value['PRED']
+    # stdin belongs to the sentences in worker mode, so the worker is never asked and only generates feature GFs with --feat-gfs y.
 
-        except:
-            token_pred = token.value[0]['PRED']
+    options['generate_feat_gfs'] = arguments.feat_gfs != None and arguments.feat_gfs.lower() == 'y'
+    options['feature_projection'] = dict(default_feature_projection)
+    options['reader'] = arguments.reader
+    options['structure_sharing'] = arguments.share_structure
+    options['validate'] = arguments.validate
+    options['orphans'] = arguments.orphans
+    options['max_tokens'] = arguments.max_tokens
 
-        open_arg, close_arg = token_pred.split(' ')
-        arg_string = ''
+    for feature in arguments.feature:
+        feat, gf = feature.split('=', 1)
+        options['feature_projection'][feat] = gf
 
-        # if the token has arguments and is not an ADJ, open_arg and close_arg are fragments of the original PRED value.
-        # the exception is for formatting PRED values inside lists.
+    # user-defined features are added to the default projection, and a feature given an empty GF is left out of it.
 
-        for argument in token.arguments:
-            if argument != '*SUBJ':
-                arg_string = arg_string + '(' + argument + ')'
+    cache = None
 
-            try:
-                token.value['PRED'] = open_arg + arg_string + close_arg
-            
-            except:
-                token.value[0]['PRED'] = open_arg + arg_string + close_arg
+    if arguments.cache != None:
+        cache = ConversionCache(arguments.cache, int(arguments.cache_size * 1048576))
 
-                # the new PRED value is formatted to include the names of the argument grammatical functions and added.
+    stats = None
+    report = None
 
-    else:
-        if token.gf not in exception_preds:
-            try:
-                token.value['PRED'] = token.lemma
-
-            except:
-                token.value[0]['PRED'] = token.lemma
-
-        # if the token has no arguments its PRED value is equal to its lemma, unless it is a special PRED value for GFs like DEF or CASE or a pronoun.
-    
-    # it is presumed that all ADJ and *COORD PREDs will be formatted before they are coordinated, if that is required (see. f_compose());
-    # this function is only designed to be called when the ADJ or *COORD has just one item in its list.
-
-# in sum, these four functions are the toolkit for f_compose(), which returns f_structures for sentences in the HDT-UD.
-# parse_filter() allows or disallows and trims the sentences for conversion, f_hierarchy orders GFs on the functional hierarchy,
-# nest_order calculates the correct order of nesting for the GFs and pred_format edits the values of the PRED GFs to list the arguments of the function or to otherwise be simplified.
-
-def f_compose(sentence):
-    f_structure = {}
-    tokens = []
-    obl_counter = 0
-    obj_counter = 1
-
-    for token in sentence:
-        token_object = Token(token)
-        token_object.convert()
-        tokens.append(token_object)
-
-        # the sentence's tokens are cast as objects of the type above, converted and listed.
-
-    tokens = nest_order(tokens)
-
-    # the tokens list now contains every token which is the head of another token, with a list of their dependants as a property, ordered for composition.
-
-    for token in tokens:
-        for dependant in token.dependants:
-            key, value = dependant.gf, dependant.value
-
-            if dependant.gf == '*COORD':
-                coordination_list = []
-
-                if type(token.value) is dict:
-                    coordination_list.append(token.value)
-                        
-                elif type(token.value) is list:
-                    for sub_value in token.value:
-                        coordination_list.append(sub_value)
-
-                for sub_value in dependant.value:
-                    coordination_list.append(sub_value)
-
-                token.value = coordination_list
-                
-                # if the dependant is a coordinated conjuntion or parataxis,
-                # the value(s) of the token must be placed inside a list with the coordinated conjunction or parataxis.
-
-            elif dependant.gf == 'COORD':
-                try:
-                    token.value[0]['COORD'] = value
-                
-                except:
-                    token.value['COORD'] = value
-                    
-                # if the dependant is a COORD, it must be the dependant of a coordinated conjunction and is nested appropriately.
-                # this may result in replacing the default COORD function values 'PARATAXIS' and 'LIST' (see. Token.convert_coordinants()).
-                
-            elif dependant.gf == '*CPOUND':
-                try:
-                    compound_token = dependant.value['PRED']
-                
-                except:
-                    compound_token = dependant.value[0]['PRED']
-
-                if compound_token[0] == '-':
-                    new_pred = token.lemma + compound_token
-
-                    try:
-                        token.value['PRED'] = '{}< >'.format(new_pred)
-                        token.form = '{}'.format(new_pred)
-                        token.lemma = '{}'.format(new_pred)
-                        
-                    except:
-                        token.value[0]['PRED'] = '{}< >'.format(new_pred)
-                        token.form = '{}'.format(new_pred)
-                        token.lemma = '{}'.format(new_pred)
-
-                else:
-                    new_pred = compound_token + token.lemma
-
-                    try:
-                        token.value['PRED'] = '{}< >'.format(new_pred)
-                        token.form = '{}'.format(new_pred)
-                        token.lemma = '{}'.format(new_pred)
-                        
-                    except:
-                        token.value[0]['PRED'] = '{}< >'.format(new_pred)
-                        token.form = '{}'.format(new_pred)
-                        token.lemma = '{}'.format(new_pred)
-
-                # if the dependant is part of a compound, it is placed at either the beginning or the end of the token's PRED value string.
-            
-            elif dependant.gf == '*SUBJ':
-                try:
-                    token.value['PRED'] = token.value['PRED'] + '(SUBJ)'
-                        
-                except:
-                    token.value[0]['PRED'] = token.value[0]['PRED'] + '(SUBJ)'
-
-                # if the dependant is an expletive subject, it is placed at the end of the token's PRED value string, outside the angled brackets.
-
-            elif dependant.gf == 'ADJ':
-                try:
-                    if 'ADJ' in token.value.keys():
-                        for sub_value in value:
-                            token.value['ADJ'].append(sub_value)
-
-                    else:
-                        try:
-                            token.value[key] = value
-
-                        except:
-                            token.value[0][key] = value
-                
-                except:
-                    if 'ADJ' in token.value[0].keys():
-                        for sub_value in value:
-                            token.value[0]['ADJ'].append(sub_value)
-
-                    else:
-                        try:
-                            token.value[key] = value
-
-                        except:
-                            token.value[0][key] = value
-
-                # if the dependant's GF is an ADJ, a check is performed to see if an ADJ function is already nested inside the token's value.
-                # if there is one, the new ADJ value(s) is (are) appended to the original ADJ's list. if there isn't, the dependant's key and value are nested inside the token's value.
-            
-            elif dependant.gf == 'OBL':
-                obl_counter += 1
-                obl_theme = False
-
-                for deep_dependant in dependant.dependants:
-                    if deep_dependant.gf == 'CASE':
-                        dependant.gf = 'OBL:{}'.format(deep_dependant.form.upper())
-                            
-                        obl_theme = True
-
-                if obl_theme == False:
-                    dependant.gf = 'OBL:{}'.format(obl_counter)
-
-                try:
-                    token.value[dependant.gf] = dependant.value
-
-                except:
-                    token.value[0][dependant.gf] = dependant.value
-
-                # if the dependant's GF is an ADJ, a check is performed to see if an OBL function is already nested inside the token's value.
-                # if there is one, the new OBL function has its self.gf property renamed to ensure that it is distinct from any other OBLs in composition.
-
-            elif dependant.gf == 'OBJ':
-                try:
-                    if 'OBJ' in token.value.keys():
-                        obj_counter += 1
-                        obj_theme = False
-
-                        for deep_dependant in dependant.dependants:
-                            if deep_dependant.gf == 'CASE':
-                                dependant.gf = 'OBJ:{}'.format(deep_dependant.form.upper())
-                                obj_theme = True
-
-                        if obj_theme == False:
-                            dependant.gf = 'OBJ:{}'.format(obj_counter)
-
-                            token.value[dependant.gf] = dependant.value
-                    
-                    else:
-                        token.value['OBJ'] = dependant.value
-                
-                except:
-                    if 'OBJ' in token.value[0].keys():
-                        obj_counter += 1
-                        obj_theme = False
-
-                        for deep_dependant in dependant.dependants:
-                            if deep_dependant.gf == 'CASE':
-                                dependant.gf = 'OBJ:{}'.format(deep_dependant.form.upper())
-                                obj_theme = True
-
-                        if obj_theme == False:
-                            dependant.gf = 'OBJ:{}'.format(obj_counter)
-
-                            token.value[0][dependant.gf] = dependant.value
-                    
-                    else:
-                        token.value[0]['OBJ'] = dependant.value
-
-                # if the dependant's GF is an ADJ, a check is performed to see if an OBL function is already nested inside the token's value.
-                # if there is one, the new OBL function has its self.gf property renamed to ensure that it is distinct from any other OBLs in composition.
+    if arguments.stats != None or arguments.progress != None or arguments.validate == True:
+        stats = ConversionStats(arguments.progress)
 
-            else:
-                if key != '*SUBJ':
-                    try:
-                        token.value[key] = value
-
-                    except:
-                        token.value[0][key] = value
-                            
-                # if the dependant is none of the above (if it is simple), and not an expletive subject,
-                # the dependant's key and value are nested inside the token's value (the exception is for nesting inside coordinated values as above).
-            
-            if dependant.arg == True:
-                token.arguments.append(dependant.gf)
+    # the errors of the validation are counted in the statistics, so a validating run always has them.
 
-                # if the dependant token is an argument, its gf is added to its head's list of arguments for pred_format().
+    if arguments.corpus != None:
+        report = convert_corpus(arguments.corpus, arguments.output_dir, options, arguments.format, arguments.gzip, arguments.index, arguments.processes, cache, stats, arguments.query_index)
+        sys.stderr.writelines(corpus_report_lines(report))
 
-        pred_format(token)
+    elif arguments.worker == True:
+        run_worker(options=options, output_format=arguments.format, cache=cache, stats=stats)
 
-        # the pred value of the token is formatted to list its arguments if it has any, and to be simplified if it does not.
+    elif arguments.incremental == True:
+        counts = convert_incremental(arguments.input, arguments.output, options, arguments.format, arguments.index, cache, stats, arguments.query_index)
+        sys.stderr.write('{unchanged} unchanged, {added} added, {changed} changed and {deleted} deleted sentences\n'.format(**counts))
 
-    matrix_pred = None
+    else:
+        if os.path.exists(manifest_path(arguments.output)) == True:
+            os.remove(manifest_path(arguments.output))
 
-    for token in tokens:
-        if token.head == 0:
-            matrix_pred = token
+        # the manifest of an earlier incremental run into the same output no longer describes it once it is written over.
 
-    # the matrix predicate is located if it is recorded in the HDT-UD (i believe there are some sentences where this is corrupted).
+        with open(arguments.input, 'r') as conllu_file, FStructureWriter(arguments.output, arguments.format, arguments.gzip, index=arguments.index, query_index=arguments.query_index) as writer:
+            if arguments.parallel == True:
+                convert_parallel(conllu_file, writer, options, arguments.processes, arguments.chunk_size, cache, stats)
 
-    if matrix_pred != None:
-        f_structure[matrix_pred.gf] = matrix_pred.value
+            elif subset == True:
+                convert_subset(arguments.input, writer, options, ids, id_range, arguments.sample, arguments.min_length, arguments.max_length, arguments.seed, cache, stats, conllu_entries)
 
-    # every token's conversion to a GF is nested inside the value of its head, and the matrix predicate is nested inside the empty f_structure.
-    # because of nest_order(), no GF can be left out of this composition.
+                # a subset is read from the input by the offsets of its sentences (see. conllu_index.py), so the rest of the input is never read.
 
-        return f_structure
+            elif arguments.pipeline == True:
+                convert_pipelined(conllu_file, writer, options, arguments.processes, arguments.chunk_size, arguments.queue_size, arguments.in_flight, cache, stats)
 
-with open('de_hdt-ud-dev.conllu', 'r') as hdt_ud_1to10000A_102001to112000B, open('hdt_ud_1to10000A_102001to112000B.txt', 'w') as f_structure_file:
-    sentence_list = parse(hdt_ud_1to10000A_102001to112000B.read())
+            else:
+                convert_stream(conllu_file, writer, options, cache, stats)
 
-    for sentence in sentence_list:
-        filtered_sentence = parse_filter(sentence)
+    if cache != None:
+        sys.stderr.write(cache.report() + '\n')
+        cache.close()
 
-        if type(filtered_sentence) != list:
-            continue
+    # the hits and misses of the cache for the run are reported, and it is evicted down to its size as it is closed.
 
-        # if the sentence is returned by parse_filter, it has no punctuation, particles or markers, and is ready to be converted into an f-structure.
+    if arguments.validate == True:
+        sys.stderr.write(stats.well_formedness_report() + '\n')
 
-        f_structure = f_compose(filtered_sentence)
+    if arguments.stats != None and report != None:
+        stats.write_summary(arguments.stats, report)
 
-        if type(f_structure) != dict:
-            continue
+    elif arguments.stats != None:
+        stats.record_string_pool(string_pool)
+        stats.write_summary(arguments.stats)
 
-        f_structure_file.write(str(f_structure))
-        f_structure_file.write('\n')
\ No newline at end of file
+    # the report of a corpus conversion has the summary of every file as well as the summary of the whole corpus.
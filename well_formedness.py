@@ -0,0 +1,99 @@
+import re
+from f_structure_nodes import FSet, container_types
+
+# the well-formedness of an f_structure is checked against the conditions of LFG on the arguments of every PRED:
+# completeness, every argument a PRED lists inside its angled brackets is present in its AVM,
+# coherence, every governable GF present in an AVM is listed as an argument of its PRED,
+# and uniqueness, no PRED lists the same argument twice, which is what f_compose() leaves behind when a second GF overwrites the first.
+# the dummy GFs of the conversion (*CPOUND, *COORD and *SUBJ) are merged into their heads by f_compose(), so any which is left over is an error too.
+
+governable_gfs = ['SUBJ', 'OBJ', 'COMP', 'XCOMP']
+governable_prefixes = ('OBJ:', 'OBL:')
+
+# OBJ:IND, OBJ:1 and OBL:MIT are governable by their prefix; SSUBJ, the placeholder '(SUBJ^)' of an open complement, is not a GF and is not checked.
+
+pred_arguments = re.compile(r'<((?:\([^()<>]*\))*)>((?:\([^()<>]*\))*)$')
+argument_names = re.compile(r'\(([^()]*)\)')
+
+# a formatted PRED is a lemma followed by its thematic arguments in angled brackets and its nonthematic arguments after them, like 'regnen<(OBL:IN)>(SUBJ)'.
+# only the thematic arguments need to be present; an expletive subject is never nested (see. f_compose()).
+
+gf_kinds = {}
+
+def gf_kind(gf):
+    if gf not in gf_kinds:
+        if gf.startswith('*'):
+            gf_kinds[gf] = 'marker'
+
+        elif gf in governable_gfs or gf.startswith(governable_prefixes):
+            gf_kinds[gf] = 'governable'
+
+        else:
+            gf_kinds[gf] = None
+
+    return gf_kinds[gf]
+
+    # the kind of every GF is worked out once and looked up after that, because the same few GFs make up almost every AVM.
+
+def avm_errors(avm, errors, stack):
+    pred = avm.get('PRED')
+    arguments = []
+
+    if type(pred) == str and '<' in pred:
+        match = pred_arguments.match(pred, pred.rfind('<'))
+
+        if match != None:
+            arguments = argument_names.findall(match.group(1))
+
+            for argument in arguments + argument_names.findall(match.group(2)):
+                if argument.startswith('*'):
+                    errors.append(('leftover marker', argument))
+
+    for position in range(len(arguments)):
+        argument = arguments[position]
+
+        if argument in arguments[:position]:
+            errors.append(('duplicate argument', argument))
+
+        elif argument not in avm and argument.startswith('*') == False:
+            errors.append(('incomplete', argument))
+
+    for gf, value in avm.items():
+        kind = gf_kind(gf)
+
+        if type(value) in container_types:
+            stack.append(value)
+
+        if kind == 'marker':
+            errors.append(('leftover marker', gf))
+
+        elif kind == 'governable' and gf not in arguments:
+            errors.append(('incoherent', gf))
+
+    # avm_errors() checks one AVM and adds the AVMs and sets nested in it to the stack of nodes to check.
+    # an AVM without a PRED, like {'BOOL': '+'}, can have no arguments, so any governable GF in it is incoherent.
+
+def well_formedness_errors(f_structure):
+    errors = []
+    seen = set()
+    stack = list(f_structure.values())
+
+    while len(stack) != 0:
+        value = stack.pop()
+
+        if id(value) in seen:
+            continue
+
+        seen.add(id(value))
+
+        if type(value) == list or type(value) == FSet:
+            stack.extend(value)
+
+        else:
+            avm_errors(value, errors, stack)
+
+    return errors
+
+    # well_formedness_errors() walks an f_structure once and returns a list of its errors, each a pair of the type of the error and the GF it concerns.
+    # the outermost AVM only holds the matrix predicate's GF, so it is not checked itself.
+    # a node which is shared (see. f_structure_nodes.py) is checked once, so the walk cannot be longer than the f_structure.